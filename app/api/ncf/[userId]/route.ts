@@ -37,18 +37,35 @@ export async function GET(request: Request, { params }: { params: { userId: stri
   const filePath = path.join(process.cwd(), 'public', 'recommendations', 'media_recommendations.json');
 
   let userItems = null;
+  // Cold users get as many items as the precomputed lists hold
+  let listLength = 10;
 
   try {
     const data = await fs.readFile(filePath, 'utf8');
     const json = JSON.parse(data);
     userItems = json[sanitizedUserId];
+    const firstList: any = Object.values(json)[0];
+    if (Array.isArray(firstList)) {
+      listLength = firstList.length;
+    }
   } catch (err) {
     console.warn('Could not read recommendations file or parse JSON, falling back to synthetic data:', err);
     // Proceed to synthetic generation
   }
 
   if (!userItems) {
-    // Generate synthetic data based on userId hash so it is consistent for the same input
+    // Cold user: serve precomputed popularity (python scripts/build_fallback_tables.py)
+    const fallbackPath = path.join(process.cwd(), 'public', 'recommendations', 'media_fallback.json');
+    try {
+      const fallback = JSON.parse(await fs.readFile(fallbackPath, 'utf8'));
+      userItems = fallback.global.slice(0, listLength);
+    } catch (err) {
+      console.warn('Could not read fallback tables, falling back to synthetic data:', err);
+    }
+  }
+
+  if (!userItems) {
+    // Last resort (fallback tables not built): generate synthetic data based on userId hash so it is consistent for the same input
     // simple deterministic generator
     let hash = 0;
     for (let i = 0; i < sanitizedUserId.length; i++) {
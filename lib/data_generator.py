@@ -93,6 +93,10 @@ def generate_ott_data(
         "sparsity": 1 - len(interactions) / (n_users * n_items),
         "popular_items": popular_items.tolist(),
         "power_users": power_users.tolist(),
+        # Segments = favourite fake genre
+        "n_segments": n_genres,
+        "user_segments": np.argmax(user_genre_pref, axis=1).tolist(),
+        "item_segments": np.argmax(item_genres, axis=1).tolist(),
     }
     
     return user_ids_array, item_ids_array, labels, metadata
@@ -169,6 +173,10 @@ def generate_social_media_data(
         "sparsity": 1 - len(interactions) / (n_users * n_items),
         "viral_items": viral_items.tolist(),
         "influencers": influencers.tolist(),
+        # Segments = echo chamber clusters
+        "n_segments": n_clusters,
+        "user_segments": user_clusters.tolist(),
+        "item_segments": item_clusters.tolist(),
     }
     
     return user_ids_array, item_ids_array, labels, metadata
@@ -236,6 +244,10 @@ def generate_media_data(
         "n_interactions": len(interactions),
         "sparsity": 1 - len(interactions) / (n_users * n_items),
         "trending_items": trending_items.tolist(),
+        # Segments = short / medium / long watch time buckets
+        "n_segments": 3,
+        "user_segments": np.digitize(user_preferences, [1 / 3, 2 / 3]).tolist(),
+        "item_segments": np.digitize(item_duration, [1 / 3, 2 / 3]).tolist(),
     }
     
     return user_ids_array, item_ids_array, labels, metadata
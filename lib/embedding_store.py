@@ -0,0 +1,188 @@
+"""
+Shared Embedding Store for Multi-Worker Serving
+
+One loader process publishes the embedding tables of a trained model as
+plain .npy files (under /dev/shm by default, so they live in shared memory).
+Worker processes memory-map them read-only and build the model around the
+mapped tables, so N workers cost one copy of the embeddings per host.
+
+Layout:
+    <root>/CURRENT                        generation number of the live model
+    <root>/gen-000001/user_embedding.npy
+    <root>/gen-000001/item_embedding.npy
+    <root>/gen-000001/model.pth           MLP weights + config (tiny, copied per worker)
+
+Publishing a new model writes a new generation directory and then atomically
+swaps CURRENT; workers notice on refresh() and re-attach.
+
+Why it's shitty:
+- Polls a file for the generation counter, no notifications
+- Old generations are deleted by count, not by checking who still uses them
+  (fine on POSIX: open maps survive unlink)
+"""
+
+import os
+import shutil
+import warnings
+import numpy as np
+import torch
+import torch.nn as nn
+from typing import Optional
+
+from lib.ncf_model import ShittyNCF
+
+
+def default_store_dir(data_type: str) -> str:
+    """Shared memory if the host has it, otherwise next to the models"""
+    if os.path.isdir("/dev/shm"):
+        return f"/dev/shm/nanoncf/{data_type}"
+    return f"models/shared/{data_type}"
+
+
+def _generation_dir(root: str, generation: int) -> str:
+    return os.path.join(root, f"gen-{generation:06d}")
+
+
+def read_generation(root: str) -> int:
+    """Current published generation, 0 if nothing was published yet"""
+    try:
+        with open(os.path.join(root, "CURRENT"), "r") as f:
+            return int(f.read().strip())
+    except FileNotFoundError:
+        return 0
+
+
+def publish_embeddings(checkpoint: dict, root: str, keep: int = 2) -> int:
+    """
+    Publish a checkpoint (as saved by train_model.py) into the store
+
+    Args:
+        checkpoint: Checkpoint dict with model_state_dict and config
+        root: Store directory
+        keep: Number of generations to keep on disk (at least 2, so a worker
+              that just read CURRENT can still open the previous one)
+
+    Returns:
+        The new generation number
+    """
+    if keep < 2:
+        raise ValueError(f"keep must be at least 2, got {keep}")
+
+    os.makedirs(root, exist_ok=True)
+    generation = read_generation(root) + 1
+    final_dir = _generation_dir(root, generation)
+    tmp_dir = final_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    state_dict = dict(checkpoint["model_state_dict"])
+    for name in ("user_embedding", "item_embedding"):
+        weight = state_dict.pop(f"{name}.weight")
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), weight.detach().float().numpy())
+
+    torch.save({
+        "mlp_state_dict": state_dict,
+        "n_users": checkpoint["n_users"],
+        "n_items": checkpoint["n_items"],
+        "embedding_dim": checkpoint["embedding_dim"],
+        "hidden_dims": checkpoint["hidden_dims"],
+        "generation": generation,
+    }, os.path.join(tmp_dir, "model.pth"))
+
+    # Directory rename, then CURRENT swap: readers never see a half-written generation
+    os.rename(tmp_dir, final_dir)
+    current_tmp = os.path.join(root, "CURRENT.tmp")
+    with open(current_tmp, "w") as f:
+        f.write(str(generation))
+    os.replace(current_tmp, os.path.join(root, "CURRENT"))
+
+    for old in range(generation - keep, 0, -1):
+        old_dir = _generation_dir(root, old)
+        if not os.path.isdir(old_dir):
+            break
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    return generation
+
+
+def attach_model(root: str, generation: Optional[int] = None, retries: int = 3) -> tuple:
+    """
+    Build a ShittyNCF whose embedding tables are read-only views of the store
+
+    Args:
+        root: Store directory
+        generation: Generation to attach (defaults to the current one)
+        retries: When attaching the current generation, how often to re-read
+                 CURRENT if its directory was pruned by a concurrent publish
+
+    Returns:
+        (model, config) tuple
+    """
+    if generation is not None:
+        return _attach_generation(root, generation)
+
+    for attempt in range(retries + 1):
+        try:
+            return _attach_generation(root, read_generation(root))
+        except FileNotFoundError:
+            # Publishers raced past us and pruned it; CURRENT has moved on
+            if attempt == retries:
+                raise
+
+
+def _attach_generation(root: str, generation: int) -> tuple:
+    """attach_model for one specific generation"""
+    if generation == 0:
+        raise FileNotFoundError(f"No embeddings published in: {root}")
+
+    gen_dir = _generation_dir(root, generation)
+    config = torch.load(os.path.join(gen_dir, "model.pth"), map_location='cpu')
+
+    # Tiny placeholder tables, swapped for the mapped ones below
+    model = ShittyNCF(
+        num_users=1,
+        num_items=1,
+        embedding_dim=config['embedding_dim'],
+        hidden_dims=config['hidden_dims']
+    )
+
+    with warnings.catch_warnings():
+        # The maps are read-only on purpose; inference never writes to them
+        warnings.filterwarnings("ignore", message="The given NumPy array is not writable")
+        for name in ("user_embedding", "item_embedding"):
+            table = np.load(os.path.join(gen_dir, f"{name}.npy"), mmap_mode="r")
+            setattr(model, name, nn.Embedding.from_pretrained(torch.from_numpy(table), freeze=True))
+
+    model.num_users = config['n_users']
+    model.num_items = config['n_items']
+    model.mlp.load_state_dict({
+        key[len("mlp."):]: value
+        for key, value in config['mlp_state_dict'].items()
+    })
+    model.eval()
+
+    return model, config
+
+
+class EmbeddingStore:
+    """
+    Worker-side handle on a shared embedding store
+
+    Call refresh() between requests to pick up newly published models.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.generation = 0
+        self.model = None
+        self.config = None
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """Re-attach if a newer generation was published, returns True on swap"""
+        if read_generation(self.root) == self.generation:
+            return False
+
+        self.model, self.config = attach_model(self.root)
+        self.generation = self.config['generation']
+        return True
@@ -0,0 +1,174 @@
+"""
+Popularity Fallback Tables for Cold Users
+
+When a user has no embedding (new signup, unknown ID) we don't ask the model,
+we look up a precomputed top-N list instead:
+- Global popularity: most interacted items overall
+- Segment popularity: most interacted items per user segment
+  (genre / cluster / watch-time bucket from the data generator)
+
+Why it's shitty:
+- Popularity is just raw positive counts, no time decay
+- One segment per user, no blending
+"""
+
+import os
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+
+def _rank_items(counts: np.ndarray, tiebreak: np.ndarray, top_n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-n items by count, ties (and empty segments) broken by `tiebreak` counts"""
+    order = np.lexsort((-tiebreak, -counts))[:top_n]
+    max_count = max(counts.max(), 1)
+    return order.astype(np.int32), (counts[order] / max_count).astype(np.float32)
+
+
+def build_fallback_tables(
+    user_ids: np.ndarray,
+    item_ids: np.ndarray,
+    labels: np.ndarray,
+    n_users: int,
+    n_items: int,
+    user_segments: Optional[np.ndarray] = None,
+    n_segments: int = 0,
+    top_n: int = 50
+) -> Dict[str, np.ndarray]:
+    """
+    Build global and per-segment popularity tables from training interactions
+
+    Args:
+        user_ids: Training user indices
+        item_ids: Training item indices
+        labels: Binary interaction labels (only positives are counted)
+        n_users: Number of known users
+        n_items: Number of items
+        user_segments: Segment index per user (optional)
+        n_segments: Number of segments
+        top_n: Items kept per table
+
+    Returns:
+        Dict of arrays, ready for np.savez
+    """
+    positive = np.asarray(labels) > 0
+    pos_users = np.asarray(user_ids)[positive].astype(np.int64)
+    pos_items = np.asarray(item_ids)[positive].astype(np.int64)
+
+    top_n = min(top_n, n_items)
+    global_counts = np.bincount(pos_items, minlength=n_items)
+    global_items, global_scores = _rank_items(global_counts, global_counts, top_n)
+
+    if user_segments is None:
+        user_segments = np.full(n_users, -1, dtype=np.int32)
+        n_segments = 0
+    user_segments = np.asarray(user_segments, dtype=np.int32)
+
+    # One bincount over (segment, item) pairs gives the whole [n_segments, n_items] count grid
+    segment_items = np.zeros((n_segments, top_n), dtype=np.int32)
+    segment_scores = np.zeros((n_segments, top_n), dtype=np.float32)
+    if n_segments > 0:
+        pair_ids = user_segments[pos_users] * n_items + pos_items
+        segment_counts = np.bincount(pair_ids, minlength=n_segments * n_items).reshape(n_segments, n_items)
+
+        for segment in range(n_segments):
+            # Small segments get backfilled with global popularity
+            segment_items[segment], segment_scores[segment] = _rank_items(
+                segment_counts[segment], global_counts, top_n
+            )
+
+    return {
+        "n_users": np.int64(n_users),
+        "n_items": np.int64(n_items),
+        "global_items": global_items,
+        "global_scores": global_scores,
+        "segment_items": segment_items,
+        "segment_scores": segment_scores,
+        "user_segments": user_segments,
+    }
+
+
+def save_fallback_tables(tables: Dict[str, np.ndarray], path: str):
+    """Save fallback tables as a single .npz file (atomically, readers may be live)"""
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, **tables)
+    os.replace(tmp_path, path)
+
+
+def extend_fallback_users(path: str, n_users: int):
+    """
+    Mark users up to n_users as known (no segment) in a saved table
+
+    Called when online updates add users to the model, so they stop
+    being treated as cold.
+    """
+    with np.load(path) as data:
+        tables = {key: data[key] for key in data.files}
+
+    old_users = int(tables["n_users"])
+    if n_users <= old_users:
+        return
+
+    tables["n_users"] = np.int64(n_users)
+    tables["user_segments"] = np.concatenate([
+        tables["user_segments"],
+        np.full(n_users - old_users, -1, dtype=np.int32)
+    ])
+    save_fallback_tables(tables, path)
+
+
+class FallbackRecommender:
+    """
+    Constant-time lookup over precomputed popularity tables
+
+    Known users with a segment get their segment's list,
+    everyone else gets the global list.
+    """
+
+    def __init__(self, tables: Dict[str, np.ndarray]):
+        self.n_users = int(tables["n_users"])
+        self.n_items = int(tables["n_items"])
+        self.global_items = tables["global_items"]
+        self.global_scores = tables["global_scores"]
+        self.segment_items = tables["segment_items"]
+        self.segment_scores = tables["segment_scores"]
+        self.user_segments = tables["user_segments"]
+
+    @classmethod
+    def load(cls, path: str) -> "FallbackRecommender":
+        with np.load(path) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def is_cold(self, user_id: int) -> bool:
+        """True if the model has no embedding for this user"""
+        return not 0 <= user_id < self.n_users
+
+    def segment_of(self, user_id: int) -> int:
+        """Segment of a known user, -1 if unknown"""
+        if self.is_cold(user_id):
+            return -1
+        return int(self.user_segments[user_id])
+
+    def get_recommendations(
+        self,
+        user_id: Optional[int] = None,
+        segment: Optional[int] = None,
+        top_k: int = 10
+    ) -> tuple:
+        """
+        Get top-k fallback recommendations
+
+        Args:
+            user_id: User index (used to find the segment, may be unknown)
+            segment: Explicit segment, overrides the user's own
+            top_k: Number of recommendations
+
+        Returns:
+            (item_ids, scores) tuple
+        """
+        if segment is None and user_id is not None:
+            segment = self.segment_of(user_id)
+
+        if segment is not None and 0 <= segment < len(self.segment_items):
+            return self.segment_items[segment][:top_k], self.segment_scores[segment][:top_k]
+
+        return self.global_items[:top_k], self.global_scores[:top_k]
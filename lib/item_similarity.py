@@ -0,0 +1,179 @@
+"""
+Item-to-Item "More Like This" Index
+
+For every item, precompute its top-k most similar items:
+- Co-occurrence: cosine over the sparse user x item interaction matrix
+  (two items are similar if the same users liked both)
+- Optionally blended with cosine similarity of ShittyNCF.item_embedding
+
+The item x item matrix is never built in full. Items are processed in
+chunks: one sparse product gives a [chunk, n_items] slab, we keep the
+top-k per row and throw the slab away. Without embeddings the slab stays
+sparse; the embedding blend needs it dense, so keep chunk_size modest.
+
+The result is two small arrays ([n_items, k] neighbours and scores) saved
+as .npy, so a lookup is a single row read from a memory map. Only building
+needs scipy; ItemSimilarityIndex is numpy-only.
+
+Why it's shitty:
+- No popularity damping, popular items show up everywhere
+- Similarity is symmetric, "people who watched X watched Y" isn't
+"""
+
+import numpy as np
+import torch
+from typing import Optional, Tuple
+
+
+def build_item_similarity(
+    user_ids: np.ndarray,
+    item_ids: np.ndarray,
+    labels: np.ndarray,
+    n_users: int,
+    n_items: int,
+    item_embeddings: Optional[np.ndarray] = None,
+    embedding_weight: float = 0.0,
+    top_k: int = 20,
+    chunk_size: int = 256
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build the item-item neighbour table
+
+    Args:
+        user_ids: Training user indices
+        item_ids: Training item indices
+        labels: Binary interaction labels (only positives are used)
+        n_users: Number of users
+        n_items: Number of items
+        item_embeddings: Item embedding table [n_items, dim] (optional)
+        embedding_weight: Share of the embedding cosine in the blend (0 = co-occurrence only)
+        top_k: Neighbours kept per item
+        chunk_size: Items per slab (memory is chunk_size x n_items floats)
+
+    Returns:
+        (neighbors [n_items, top_k] int32, scores [n_items, top_k] float32);
+        items with fewer than top_k co-occurring items are padded with -1
+    """
+    # Only the build needs scipy; inference reads the saved arrays with numpy
+    import scipy.sparse as sp
+
+    positive = np.asarray(labels) > 0
+    users = np.asarray(user_ids)[positive]
+    items = np.asarray(item_ids)[positive]
+
+    # Binary user x item matrix (repeat interactions count once)
+    interactions = sp.csr_matrix(
+        (np.ones(len(users), dtype=np.float32), (users, items)),
+        shape=(n_users, n_items)
+    )
+    interactions.data[:] = 1.0
+    items_by_user = interactions.T.tocsr()
+
+    # Cosine normaliser: sqrt of each item's user count
+    norms = np.sqrt(np.asarray(interactions.sum(axis=0)).ravel())
+    norms[norms == 0] = 1.0
+
+    if item_embeddings is not None and embedding_weight > 0:
+        item_embeddings = np.asarray(item_embeddings, dtype=np.float32)
+        item_embeddings = item_embeddings / np.maximum(
+            np.linalg.norm(item_embeddings, axis=1, keepdims=True), 1e-8
+        )
+    else:
+        item_embeddings = None
+
+    top_k = min(top_k, n_items - 1)
+    neighbors = np.full((n_items, top_k), -1, dtype=np.int32)
+    scores = np.zeros((n_items, top_k), dtype=np.float32)
+
+    for start in range(0, n_items, chunk_size):
+        stop = min(start + chunk_size, n_items)
+
+        # Sparse [chunk, n_items] co-occurrence counts -> cosine
+        slab = (items_by_user[start:stop] @ interactions).tocsr()
+        slab_rows = np.repeat(np.arange(stop - start), np.diff(slab.indptr))
+        slab_cols = slab.indices
+        slab_scores = slab.data / (norms[start + slab_rows] * norms[slab_cols])
+
+        # An item is not its own neighbour
+        keep = slab_cols != start + slab_rows
+        slab_rows, slab_cols, slab_scores = slab_rows[keep], slab_cols[keep], slab_scores[keep]
+
+        if item_embeddings is None:
+            _top_k_sparse(slab_rows, slab_cols, slab_scores, neighbors[start:stop], scores[start:stop])
+        else:
+            _top_k_blended(
+                slab_rows, slab_cols, slab_scores,
+                item_embeddings, start, stop, embedding_weight,
+                neighbors[start:stop], scores[start:stop]
+            )
+
+    return neighbors, scores
+
+
+def _top_k_sparse(rows, cols, values, out_neighbors, out_scores):
+    """Per-row top-k straight from the non-zeros; rows with fewer stay padded with -1"""
+    top_k = out_neighbors.shape[1]
+
+    # Sort by row, then by descending score, and keep the first k of each row
+    order = np.lexsort((-values, rows))
+    rows, cols, values = rows[order], cols[order], values[order]
+
+    row_starts = np.searchsorted(rows, rows, side="left")
+    rank = np.arange(len(rows)) - row_starts
+    keep = rank < top_k
+
+    out_neighbors[rows[keep], rank[keep]] = cols[keep]
+    out_scores[rows[keep], rank[keep]] = values[keep]
+
+
+def _top_k_blended(rows, cols, values, item_embeddings, start, stop, embedding_weight, out_neighbors, out_scores):
+    """Dense [chunk, n_items] slab of embedding cosine plus the sparse co-occurrence part"""
+    top_k = out_neighbors.shape[1]
+
+    slab = item_embeddings[start:stop] @ item_embeddings.T  # float32
+    slab *= embedding_weight
+    slab[rows, cols] += (1 - embedding_weight) * values
+
+    diagonal = np.arange(stop - start)
+    slab[diagonal, start + diagonal] = -np.inf
+
+    # torch.topk is multithreaded and returns the k already sorted
+    top_scores, top = torch.topk(torch.from_numpy(slab), top_k, dim=1)
+
+    out_neighbors[:] = top.numpy()
+    out_scores[:] = top_scores.numpy()
+
+
+def save_item_similarity(neighbors: np.ndarray, scores: np.ndarray, prefix: str):
+    """Save as <prefix>_neighbors.npy (int32) and <prefix>_scores.npy (float16)"""
+    np.save(f"{prefix}_neighbors.npy", neighbors.astype(np.int32))
+    np.save(f"{prefix}_scores.npy", scores.astype(np.float16))
+
+
+class ItemSimilarityIndex:
+    """Constant-time "more like this" lookups over a saved neighbour table"""
+
+    def __init__(self, prefix: str):
+        self.neighbors = np.load(f"{prefix}_neighbors.npy", mmap_mode="r")
+        self.scores = np.load(f"{prefix}_scores.npy", mmap_mode="r")
+        self.n_items, self.top_k = self.neighbors.shape
+
+    def similar_items(self, item_id: int, top_k: int = 10) -> tuple:
+        """
+        Get the most similar items
+
+        Args:
+            item_id: Item index
+            top_k: Number of neighbours (at most the table width)
+
+        Returns:
+            (item_ids, scores) tuple
+        """
+        if not 0 <= item_id < self.n_items:
+            raise IndexError(f"Unknown item: {item_id}")
+
+        neighbors = np.array(self.neighbors[item_id, :top_k])
+        scores = self.scores[item_id, :top_k].astype(np.float32)
+
+        valid = neighbors >= 0
+        return neighbors[valid], scores[valid]
@@ -7,13 +7,25 @@ Why it's shitty:
 - No dropout, batch norm, or regularization
 - Overfits on synthetic data (that's the point)
 - CPU-only, no GPU optimization
+
+Mixed precision (opt-in): training and inference can run the MLP under
+torch.autocast on CPU with bfloat16. Training keeps float32 master weights;
+for inference the whole model can also be cast with model.to(torch.bfloat16),
+which halves embedding memory traffic. Inference always applies the final
+sigmoid in float32, bfloat16 is too coarse around 0.5 to keep the ranking.
 """
 
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import numpy as np
 
 
+def _autocast(enabled: bool):
+    """bfloat16 autocast on CPU (a no-op context when disabled)"""
+    return torch.autocast("cpu", dtype=torch.bfloat16, enabled=enabled)
+
+
 class ShittyNCF(nn.Module):
     """
     A deliberately minimal Neural Collaborative Filtering model.
@@ -75,6 +87,19 @@ class ShittyNCF(nn.Module):
         Returns:
             Interaction probabilities [batch_size, 1]
         """
+        return self.mlp[-1](self.logits(user_ids, item_ids))
+    
+    def logits(self, user_ids: torch.Tensor, item_ids: torch.Tensor) -> torch.Tensor:
+        """
+        Forward pass without the final sigmoid
+        
+        Args:
+            user_ids: Tensor of user indices [batch_size]
+            item_ids: Tensor of item indices [batch_size]
+        
+        Returns:
+            Logits [batch_size, 1]
+        """
         # Get embeddings
         user_emb = self.user_embedding(user_ids)  # [batch_size, embedding_dim]
         item_emb = self.item_embedding(item_ids)  # [batch_size, embedding_dim]
@@ -82,35 +107,68 @@ class ShittyNCF(nn.Module):
         # Concatenate (the "interaction" part)
         interaction = torch.cat([user_emb, item_emb], dim=1)  # [batch_size, 2*embedding_dim]
         
-        # Pass through MLP
-        output = self.mlp(interaction)  # [batch_size, 1]
+        # Pass through MLP, minus the final sigmoid
+        return self.mlp[:-1](interaction)  # [batch_size, 1]
+    
+    def score_block(self, user_ids: torch.Tensor, item_ids: torch.Tensor) -> torch.Tensor:
+        """
+        Score every user against every item (pre-sigmoid logits)
+        
+        The first MLP layer is linear in the concatenation, so it splits into a
+        user half and an item half. Each half is computed once per row instead
+        of once per pair, and only the cheap add + rest of the MLP runs per pair.
         
-        return output
+        Args:
+            user_ids: Tensor of user indices [n_users]
+            item_ids: Tensor of item indices [n_items]
+        
+        Returns:
+            Logits [n_users, n_items]
+        """
+        first = self.mlp[0]
+        dim = self.embedding_dim
+        
+        user_part = F.linear(self.user_embedding(user_ids), first.weight[:, :dim], first.bias)  # [n_users, hidden]
+        item_part = F.linear(self.item_embedding(item_ids), first.weight[:, dim:])  # [n_items, hidden]
+        
+        hidden = user_part.unsqueeze(1) + item_part.unsqueeze(0)  # [n_users, n_items, hidden]
+        
+        # Rest of the MLP, minus the final sigmoid
+        return self.mlp[1:-1](hidden).squeeze(-1)
     
-    def predict(self, user_ids: np.ndarray, item_ids: np.ndarray) -> np.ndarray:
+    def predict(
+        self,
+        user_ids: np.ndarray,
+        item_ids: np.ndarray,
+        mixed_precision: bool = False
+    ) -> np.ndarray:
         """
         Predict interaction probabilities for user-item pairs
         
         Args:
             user_ids: Array of user indices
             item_ids: Array of item indices
+            mixed_precision: Run under bfloat16 autocast
         
         Returns:
             Interaction probabilities
         """
         self.eval()
-        with torch.no_grad():
+        with torch.no_grad(), _autocast(mixed_precision):
             user_tensor = torch.LongTensor(user_ids)
             item_tensor = torch.LongTensor(item_ids)
             
-            predictions = self.forward(user_tensor, item_tensor)
-            return predictions.numpy().flatten()
+            logits = self.logits(user_tensor, item_tensor)
+            # Sigmoid in float32: in bfloat16 it rounds scores near 0.5 to
+            # steps of 1/256, which collapses the ranking into ties
+            return torch.sigmoid(logits.float()).numpy().flatten()
     
     def get_recommendations(
         self, 
         user_id: int, 
         item_ids: np.ndarray, 
-        top_k: int = 10
+        top_k: int = 10,
+        mixed_precision: bool = False
     ) -> tuple:
         """
         Get top-k recommendations for a user
@@ -119,13 +177,14 @@ class ShittyNCF(nn.Module):
             user_id: User index
             item_ids: Array of candidate item indices
             top_k: Number of recommendations
+            mixed_precision: Run under bfloat16 autocast
         
         Returns:
             (item_ids, scores) tuple
         """
         # Predict for all items
         user_array = np.full(len(item_ids), user_id)
-        scores = self.predict(user_array, item_ids)
+        scores = self.predict(user_array, item_ids, mixed_precision=mixed_precision)
         
         # Get top-k
         top_indices = np.argsort(scores)[::-1][:top_k]
@@ -133,6 +192,119 @@ class ShittyNCF(nn.Module):
         top_scores = scores[top_indices]
         
         return top_items, top_scores
+    
+    def score_users(
+        self,
+        user_ids: np.ndarray,
+        item_ids: np.ndarray,
+        item_chunk_size: int = 512,
+        mixed_precision: bool = False
+    ) -> np.ndarray:
+        """
+        Full score matrix for a batch of users
+        
+        Args:
+            user_ids: Array of user indices
+            item_ids: Array of item indices
+            item_chunk_size: Items scored per block
+            mixed_precision: Run under bfloat16 autocast
+        
+        Returns:
+            Interaction probabilities [n_users, n_items]
+        """
+        self.eval()
+        with torch.no_grad(), _autocast(mixed_precision):
+            user_tensor = torch.LongTensor(user_ids)
+            item_tensor = torch.LongTensor(item_ids)
+            
+            logits = torch.cat([
+                self.score_block(user_tensor, item_tensor[start:start + item_chunk_size]).float()
+                for start in range(0, len(item_ids), item_chunk_size)
+            ], dim=1)
+            
+            return torch.sigmoid(logits).numpy()
+    
+    def recommend_batch(
+        self,
+        user_ids: np.ndarray,
+        item_ids: np.ndarray,
+        top_k: int = 10,
+        item_chunk_size: int = 512,
+        mixed_precision: bool = False
+    ) -> tuple:
+        """
+        Get top-k recommendations for many users at once
+        
+        Items are scored in chunks with score_block and merged into a running
+        top-k, so memory stays at len(user_ids) x item_chunk_size x hidden
+        no matter how big the catalog is.
+        
+        Args:
+            user_ids: Array of user indices
+            item_ids: Array of candidate item indices
+            top_k: Number of recommendations per user
+            item_chunk_size: Candidate items scored per block
+            mixed_precision: Run under bfloat16 autocast
+        
+        Returns:
+            (item_ids [n_users, top_k], scores [n_users, top_k]) tuple
+        """
+        self.eval()
+        top_k = min(top_k, len(item_ids))
+        
+        with torch.no_grad(), _autocast(mixed_precision):
+            user_tensor = torch.LongTensor(user_ids)
+            item_tensor = torch.LongTensor(item_ids)
+            
+            best_logits = torch.empty(len(user_ids), 0)
+            best_positions = torch.empty(len(user_ids), 0, dtype=torch.long)
+            
+            for start in range(0, len(item_ids), item_chunk_size):
+                logits = self.score_block(user_tensor, item_tensor[start:start + item_chunk_size]).float()
+                positions = torch.arange(start, start + logits.shape[1]).expand_as(logits)
+                
+                # Merge this chunk into the running top-k
+                best_logits = torch.cat([best_logits, logits], dim=1)
+                best_positions = torch.cat([best_positions, positions], dim=1)
+                best_logits, order = torch.topk(best_logits, min(top_k, best_logits.shape[1]), dim=1)
+                best_positions = torch.gather(best_positions, 1, order)
+            
+            top_items = item_tensor[best_positions].numpy()
+            top_scores = torch.sigmoid(best_logits).numpy()
+        
+        return top_items, top_scores
+
+
+def _in_batch_loss(
+    model: ShittyNCF,
+    batch_users: torch.Tensor,
+    batch_items: torch.Tensor,
+    loss_type: str
+) -> torch.Tensor:
+    """
+    BPR / sampled softmax loss with the other items in the batch as negatives
+    
+    Row i of the score block is user i against every item in the batch; the
+    diagonal holds the observed positives. Columns with the same item or the
+    same user as row i are probably positives too, so they're masked out.
+    
+    Returns None if the batch has no usable negatives.
+    """
+    logits = model.score_block(batch_users, batch_items).float()  # [batch, batch]
+    
+    not_negative = (batch_items.unsqueeze(0) == batch_items.unsqueeze(1)) | \
+                   (batch_users.unsqueeze(0) == batch_users.unsqueeze(1))
+    if not_negative.all():
+        return None
+    
+    if loss_type == "bpr":
+        positive_logits = logits.diagonal().unsqueeze(1)
+        pair_losses = -F.logsigmoid(positive_logits - logits)
+        return pair_losses[~not_negative].mean()
+    
+    targets = torch.arange(len(batch_users), device=logits.device)
+    masked = logits.masked_fill(not_negative & (targets.unsqueeze(0) != targets.unsqueeze(1)), float("-inf"))
+    return F.cross_entropy(masked, targets)
 
 
 def train_shitty_ncf(
@@ -143,11 +315,26 @@ def train_shitty_ncf(
     epochs: int = 10,
     batch_size: int = 256,
     learning_rate: float = 0.01,
-    device: str = "cpu"
+    device: str = "cpu",
+    loss_type: str = "bce",
+    mixed_precision: bool = False,
+    optimizer: torch.optim.Optimizer = None
 ) -> list:
     """
     Train the model (the shitty way - no validation, no early stopping)
     
+    Loss types:
+    - "bce": pointwise, every (user, item, label) row is its own forward pass
+    - "bpr": pairwise, each positive vs. the other items in the batch
+    - "softmax": sampled softmax, the other items in the batch are the negatives
+    
+    The pairwise modes only use the positive rows; negatives come for free from
+    the batch, scored together in one user x item block.
+    
+    With mixed_precision the forward pass runs under bfloat16 autocast; the
+    weights, gradients and Adam state stay float32 and the loss is computed
+    in float32.
+    
     Args:
         model: ShittyNCF model
         user_ids: Training user indices
@@ -157,15 +344,33 @@ def train_shitty_ncf(
         batch_size: Batch size
         learning_rate: Learning rate
         device: Device to train on (probably "cpu")
+        loss_type: "bce", "bpr" or "softmax"
+        mixed_precision: bfloat16 autocast for the forward pass
+        optimizer: Optimizer over model.parameters() to keep using, so training
+                   can resume where an earlier call stopped (a fresh Adam
+                   with learning_rate otherwise)
     
     Returns:
         List of losses per epoch
     """
+    if loss_type not in ("bce", "bpr", "softmax"):
+        raise ValueError(f"Unknown loss type: {loss_type}")
+    if loss_type != "bce" and batch_size < 2:
+        raise ValueError(f"{loss_type} needs batch_size >= 2 for in-batch negatives")
+    
     model.train()
     model = model.to(device)
     
     criterion = nn.BCELoss()
-    optimizer = torch.optim.Adam(model.parameters(), lr=learning_rate)
+    if optimizer is None:
+        optimizer = torch.optim.Adam(model.parameters(), lr=learning_rate)
+    
+    if loss_type != "bce":
+        # In-batch negatives replace the sampled ones
+        positive = np.asarray(labels) > 0
+        user_ids = np.asarray(user_ids)[positive]
+        item_ids = np.asarray(item_ids)[positive]
+        labels = np.asarray(labels)[positive]
     
     # Convert to tensors
     user_tensor = torch.LongTensor(user_ids)
@@ -190,8 +395,14 @@ def train_shitty_ncf(
             batch_labels = label_tensor[batch_indices].to(device)
             
             # Forward pass
-            predictions = model(batch_users, batch_items).squeeze()
-            loss = criterion(predictions, batch_labels)
+            with _autocast(mixed_precision):
+                if loss_type == "bce":
+                    predictions = model(batch_users, batch_items).squeeze().float()
+                    loss = criterion(predictions, batch_labels)
+                else:
+                    loss = _in_batch_loss(model, batch_users, batch_items, loss_type)
+            if loss is None:
+                continue
             
             # Backward pass
             optimizer.zero_grad()
@@ -201,7 +412,8 @@ def train_shitty_ncf(
             epoch_loss += loss.item()
             n_batches += 1
         
-        avg_loss = epoch_loss / n_batches
+        # Every batch can lack negatives (e.g. a single user), nothing to average then
+        avg_loss = epoch_loss / n_batches if n_batches else float("nan")
         losses.append(avg_loss)
         
         if (epoch + 1) % 5 == 0:
@@ -0,0 +1,167 @@
+"""
+Online Learning for the Shitty NCF Model
+
+Tails an append-only interaction log and keeps training the model on new
+events, instead of regenerating data and retraining from scratch.
+
+Log format: one "user_id,item_id" positive interaction per line.
+
+- New user / item IDs grow the embedding tables (with headroom, so we
+  don't reallocate on every new ID)
+- Negatives are sampled on the fly, uniformly over known items
+- The Adam state survives table growth
+
+Why it's shitty:
+- Uniform negatives may hit items the user actually liked
+- No replay of old data, so the model slowly forgets
+"""
+
+import os
+import numpy as np
+import torch
+import torch.nn as nn
+from typing import List, Tuple
+
+from lib.ncf_model import ShittyNCF
+
+
+class LogTailer:
+    """
+    Reads complete new lines from an append-only log, starting at a byte offset
+
+    The offset only moves past full lines, so a half-written last line is
+    picked up on the next read.
+    """
+
+    def __init__(self, path: str, offset: int = 0):
+        self.path = path
+        self.offset = offset
+        self.n_malformed = 0
+
+    def read_new(self, max_bytes: int = 1 << 20) -> List[Tuple[int, int]]:
+        """Return (user_id, item_id) pairs appended since the last call"""
+        if not os.path.exists(self.path):
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(max_bytes)
+
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            return []
+        self.offset += end + 1
+
+        events = []
+        for line in chunk[:end].splitlines():
+            parts = line.split(b",")
+            try:
+                user_id, item_id = int(parts[0]), int(parts[1])
+            except (ValueError, IndexError):
+                self.n_malformed += 1
+                continue
+            if user_id < 0 or item_id < 0:
+                self.n_malformed += 1
+                continue
+            events.append((user_id, item_id))
+
+        return events
+
+
+class OnlineTrainer:
+    """
+    Incremental trainer around an existing ShittyNCF
+
+    model.num_users / model.num_items are the logical counts (max ID + 1);
+    the embedding tables may have spare rows beyond them.
+    """
+
+    def __init__(
+        self,
+        model: ShittyNCF,
+        learning_rate: float = 0.01,
+        n_negatives: int = 4,
+        growth_factor: float = 1.5
+    ):
+        self.model = model
+        self.n_negatives = n_negatives
+        self.growth_factor = growth_factor
+        self.criterion = nn.BCELoss()
+        self.optimizer = torch.optim.Adam(model.parameters(), lr=learning_rate)
+
+    def _grow(self, name: str, n_rows: int):
+        """Swap an embedding table for a bigger one, keeping weights and Adam state"""
+        old_weight = getattr(self.model, name).weight
+        old_rows, dim = old_weight.shape
+        new_rows = max(n_rows, int(old_rows * self.growth_factor))
+
+        embedding = nn.Embedding(new_rows, dim)
+        with torch.no_grad():
+            embedding.weight[:old_rows] = old_weight
+            # New IDs start out looking like a random existing one
+            embedding.weight[old_rows:].normal_(0.0, float(old_weight.std()))
+
+        # Move Adam's running moments over to the new parameter
+        state = self.optimizer.state.pop(old_weight, None)
+        if state:
+            for key in ("exp_avg", "exp_avg_sq"):
+                padded = torch.zeros_like(embedding.weight)
+                padded[:old_rows] = state[key]
+                state[key] = padded
+            self.optimizer.state[embedding.weight] = state
+
+        for group in self.optimizer.param_groups:
+            group["params"] = [embedding.weight if p is old_weight else p for p in group["params"]]
+
+        setattr(self.model, name, embedding)
+
+    def ensure_capacity(self, max_user_id: int, max_item_id: int):
+        """Grow the embedding tables so the given IDs exist"""
+        if max_user_id >= self.model.user_embedding.num_embeddings:
+            self._grow("user_embedding", max_user_id + 1)
+        if max_item_id >= self.model.item_embedding.num_embeddings:
+            self._grow("item_embedding", max_item_id + 1)
+
+        self.model.num_users = max(self.model.num_users, max_user_id + 1)
+        self.model.num_items = max(self.model.num_items, max_item_id + 1)
+
+    def update(self, user_ids: np.ndarray, item_ids: np.ndarray) -> float:
+        """
+        One gradient step on a micro-batch of positive interactions
+
+        Args:
+            user_ids: User indices of new interactions
+            item_ids: Item indices of new interactions
+
+        Returns:
+            Batch loss
+        """
+        self.ensure_capacity(int(user_ids.max()), int(item_ids.max()))
+
+        # On-the-fly negatives: same users, random known items
+        neg_users = np.repeat(user_ids, self.n_negatives)
+        neg_items = np.random.randint(0, self.model.num_items, size=len(neg_users))
+
+        batch_users = torch.LongTensor(np.concatenate([user_ids, neg_users]))
+        batch_items = torch.LongTensor(np.concatenate([item_ids, neg_items]))
+        batch_labels = torch.cat([
+            torch.ones(len(user_ids)),
+            torch.zeros(len(neg_users))
+        ])
+
+        self.model.train()
+        predictions = self.model(batch_users, batch_items).squeeze(1)
+        loss = self.criterion(predictions, batch_labels)
+
+        self.optimizer.zero_grad()
+        loss.backward()
+        self.optimizer.step()
+
+        return loss.item()
+
+    def state_dict(self) -> dict:
+        """Model weights trimmed to the logical user / item counts"""
+        state_dict = {key: value.detach().clone() for key, value in self.model.state_dict().items()}
+        state_dict["user_embedding.weight"] = state_dict["user_embedding.weight"][:self.model.num_users]
+        state_dict["item_embedding.weight"] = state_dict["item_embedding.weight"][:self.model.num_items]
+        return state_dict
@@ -0,0 +1,191 @@
+"""
+Full Per-User Score Store
+
+Precompute keeps only the top-k items per user, which caps what the API can
+return and leaves nothing to fall back on once business rules filter items
+out. The score store keeps every user's full item score vector instead, so
+top-k for any k, exclusion lists and category filters can run later without
+the model.
+
+Layout:
+    <path>/scores.npy          [n_users, n_items] uint8 or float16 (memory-mapped)
+    <path>/offsets.npy         [n_users] float32
+    <path>/scales.npy          [n_users] float32   (all ones for float16)
+    <path>/item_categories.npy [n_items] int32     (optional, -1 = no category)
+    <path>/meta.json
+
+Both dtypes store scores relative to the user's lowest score:
+score = offset + scale * q. Scores for one user tend to sit in a narrow band
+around 0.5, where raw float16 is coarser than that band needs (~5e-4 steps).
+
+- uint8 is quantized per user (scale = range / 255), so scores closer than
+  1/255 of the user's range become ties and may swap
+- float16 stores score - offset unscaled (scale = 1); small values keep
+  float16's full relative precision, far finer than the uint8 step
+
+top-k runs on the stored values directly, so the order is kept up to those
+ties. Precompute with --score-dtype float16 when ranking fidelity matters
+more than size.
+
+Why it's shitty:
+- n_users x n_items bytes is fine for this demo, not for a real catalog
+- Rewritten from scratch on every precompute
+"""
+
+import os
+import json
+import numpy as np
+from typing import Iterable, Optional
+
+from lib.ncf_model import ShittyNCF
+
+
+def build_score_store(
+    model: ShittyNCF,
+    path: str,
+    n_users: int,
+    n_items: int,
+    dtype: str = "uint8",
+    block_size: int = 512,
+    item_categories: Optional[np.ndarray] = None
+):
+    """
+    Score every user against every item and write the store, one user block at a time
+
+    Args:
+        model: Trained ShittyNCF
+        path: Store directory
+        n_users: Number of users
+        n_items: Number of items
+        dtype: "uint8" (per-user quantized) or "float16" (per-user offset)
+        block_size: Users scored and written per block
+        item_categories: Category per item, for filtered top-k (optional). Items
+                         added after training (online_update.py) have none, so
+                         a shorter array is padded with -1 (no category)
+    """
+    if dtype not in ("uint8", "float16"):
+        raise ValueError(f"Unknown score store dtype: {dtype}")
+
+    os.makedirs(path, exist_ok=True)
+    item_ids = np.arange(n_items)
+
+    scores = np.lib.format.open_memmap(
+        os.path.join(path, "scores.npy"), mode="w+", dtype=dtype, shape=(n_users, n_items)
+    )
+    offsets = np.zeros(n_users, dtype=np.float32)
+    scales = np.ones(n_users, dtype=np.float32)
+
+    for start in range(0, n_users, block_size):
+        stop = min(start + block_size, n_users)
+        block = model.score_users(np.arange(start, stop), item_ids)
+
+        low = block.min(axis=1)
+        if dtype == "uint8":
+            scale = (block.max(axis=1) - low) / 255
+            scale[scale == 0] = 1.0
+            scores[start:stop] = np.rint((block - low[:, None]) / scale[:, None])
+            scales[start:stop] = scale
+        else:
+            scores[start:stop] = block - low[:, None]
+        offsets[start:stop] = low
+
+    scores.flush()
+    del scores
+
+    np.save(os.path.join(path, "offsets.npy"), offsets)
+    np.save(os.path.join(path, "scales.npy"), scales)
+    if item_categories is not None:
+        item_categories = np.asarray(item_categories, dtype=np.int32)
+        if len(item_categories) > n_items:
+            raise ValueError(f"{len(item_categories)} item categories for {n_items} items")
+        padded = np.full(n_items, -1, dtype=np.int32)
+        padded[:len(item_categories)] = item_categories
+        np.save(os.path.join(path, "item_categories.npy"), padded)
+
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({
+            "n_users": n_users,
+            "n_items": n_items,
+            "dtype": dtype,
+            "block_size": block_size,
+        }, f, indent=2)
+
+
+class ScoreStore:
+    """
+    Read side of the score store: top-k with filters, straight from disk
+
+    Each query reads one user row from the memory map; nothing else is loaded.
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json"), "r") as f:
+            meta = json.load(f)
+
+        self.n_users = meta["n_users"]
+        self.n_items = meta["n_items"]
+        self.dtype = meta["dtype"]
+
+        self.scores = np.load(os.path.join(path, "scores.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(path, "offsets.npy"))
+        self.scales = np.load(os.path.join(path, "scales.npy"))
+
+        categories_path = os.path.join(path, "item_categories.npy")
+        self.item_categories = np.load(categories_path) if os.path.exists(categories_path) else None
+        if self.item_categories is not None and len(self.item_categories) != self.n_items:
+            raise ValueError(
+                f"Score store has {len(self.item_categories)} item categories for {self.n_items} items"
+            )
+
+    def user_scores(self, user_id: int) -> np.ndarray:
+        """Dequantized score vector for one user"""
+        row = np.asarray(self.scores[user_id], dtype=np.float32)
+        return self.offsets[user_id] + self.scales[user_id] * row
+
+    def top_k(
+        self,
+        user_id: int,
+        k: int = 10,
+        exclude: Optional[Iterable[int]] = None,
+        categories: Optional[Iterable[int]] = None
+    ) -> tuple:
+        """
+        Get the top-k items for a user, after filtering
+
+        Args:
+            user_id: User index
+            k: Number of items (any k, up to the catalog size)
+            exclude: Item IDs to leave out (already watched, blocked, ...)
+            categories: Only keep items in these categories
+
+        Returns:
+            (item_ids, scores) tuple, may be shorter than k if filters leave fewer items
+        """
+        if not 0 <= user_id < self.n_users:
+            raise IndexError(f"Unknown user: {user_id}")
+
+        # Rank on the stored row: offset and scale are per user, so the order holds up to ties
+        row = np.asarray(self.scores[user_id], dtype=np.float32)
+        allowed = np.ones(self.n_items, dtype=bool)
+
+        if exclude is not None:
+            exclude = np.asarray(list(exclude), dtype=np.int64)
+            allowed[exclude[(exclude >= 0) & (exclude < self.n_items)]] = False
+        if categories is not None:
+            if self.item_categories is None:
+                raise ValueError("Score store has no item categories")
+            allowed &= np.isin(self.item_categories, list(categories))
+
+        candidates = np.flatnonzero(allowed)
+        k = min(k, len(candidates))
+        if k == 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+
+        candidate_scores = row[candidates]
+        top = np.argpartition(-candidate_scores, k - 1)[:k]
+        top = top[np.argsort(-candidate_scores[top], kind="stable")]
+
+        top_items = candidates[top]
+        top_scores = self.offsets[user_id] + self.scales[user_id] * candidate_scores[top]
+
+        return top_items, top_scores
@@ -0,0 +1,76 @@
+"""
+Per-Host CPU Tuning Profiles
+
+scripts/autotune.py measures this machine and saves the best thread /
+process / batch settings for each workload profile:
+- "train":   train_shitty_ncf throughput
+- "latency": single-user get_recommendations latency (the API path)
+- "bulk":    recommend_batch throughput (bulk inference, precompute)
+
+Scripts call apply_tuning(<profile>) at startup, which sets torch's
+intra-op / inter-op thread counts and returns the settings so the caller
+can pick up batch size and process count. No profile file = PyTorch defaults.
+
+The profile lives in models/tuning/<hostname>.json, or wherever
+NANONCF_TUNING_PROFILE points.
+"""
+
+import os
+import json
+import socket
+import torch
+from typing import Optional
+
+PROFILES = ("train", "latency", "bulk")
+
+
+def default_profile_path() -> str:
+    """Tuning profile for this host"""
+    return os.environ.get("NANONCF_TUNING_PROFILE", f"models/tuning/{socket.gethostname()}.json")
+
+
+def load_tuning_profile(path: Optional[str] = None) -> dict:
+    """Load the whole tuning file, {} if this host was never tuned"""
+    path = path or default_profile_path()
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_tuning_profile(tuning: dict, path: Optional[str] = None):
+    """Save the tuning file"""
+    path = path or default_profile_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(tuning, f, indent=2)
+
+
+def apply_tuning(profile: str, path: Optional[str] = None) -> dict:
+    """
+    Apply a tuned profile to this process
+
+    Must run before any torch work: inter-op threads can only be set once.
+
+    Args:
+        profile: "train", "latency" or "bulk"
+        path: Tuning file (defaults to this host's)
+
+    Returns:
+        The profile's settings (intra_op_threads, inter_op_threads,
+        processes, batch_size), or {} if there is none
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown tuning profile: {profile}")
+
+    settings = load_tuning_profile(path).get("profiles", {}).get(profile, {})
+
+    if "intra_op_threads" in settings:
+        torch.set_num_threads(settings["intra_op_threads"])
+    if "inter_op_threads" in settings:
+        try:
+            torch.set_num_interop_threads(settings["inter_op_threads"])
+        except RuntimeError:
+            pass  # Too late, torch already started its inter-op pool
+
+    return settings
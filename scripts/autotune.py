@@ -0,0 +1,286 @@
+"""
+Autotune CPU threads, process count and batch size for this host
+Runs short calibration workloads for the train, latency and bulk profiles
+and saves the winners to the per-host tuning profile (see lib/tuning.py)
+
+Search, per profile:
+1. (processes, intra-op threads) with processes x threads <= cores
+2. batch size, with the best (processes, threads)
+3. inter-op threads, with everything else fixed
+
+The train batch size is picked for throughput only; bigger batches also
+change what the model learns, so train_model.py only uses it with
+--batch-size tuned (check it with scripts/sweep.py first).
+
+Every configuration runs in fresh processes (inter-op threads can only be
+set once per process), all started together behind a barrier so they
+compete for the cores like real workers would.
+"""
+
+import sys
+import os
+import time
+import socket
+import threading
+import multiprocessing as mp
+from queue import Empty
+from typing import Optional
+import numpy as np
+import torch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.ncf_model import ShittyNCF, train_shitty_ncf
+from lib.tuning import PROFILES, default_profile_path, load_tuning_profile, save_tuning_profile
+
+
+# Batch sizes tried per profile (latency always scores one user against the catalog)
+BATCH_SIZES = {
+    "train": [128, 256, 512, 1024],
+    "latency": [None],
+    "bulk": [128, 512, 2048],
+}
+DEFAULT_BATCH_SIZE = {"train": 256, "latency": None, "bulk": 512}
+
+# Seconds a worker gets to start, build the model and warm up
+STARTUP_TIMEOUT = 120.0
+
+
+def _calibration_worker(profile: str, settings: dict, model_config: dict, duration: float,
+                        startup_timeout: float, barrier, queue):
+    """Run one workload for `duration` seconds and report units done + latencies"""
+    torch.set_num_threads(settings["intra_op_threads"])
+    try:
+        torch.set_num_interop_threads(settings["inter_op_threads"])
+    except RuntimeError:
+        pass
+
+    torch.manual_seed(0)
+    rng = np.random.default_rng(0)
+    n_users, n_items = model_config["n_users"], model_config["n_items"]
+    model = ShittyNCF(n_users, n_items, embedding_dim=model_config["embedding_dim"], hidden_dims=[32, 16])
+    item_ids = np.arange(n_items)
+    batch_size = settings["batch_size"]
+
+    if profile == "train":
+        n_samples = batch_size * 16
+        users = rng.integers(0, n_users, n_samples)
+        items = rng.integers(0, n_items, n_samples)
+        labels = rng.integers(0, 2, n_samples).astype(np.float32)
+
+        def step():
+            train_shitty_ncf(model, users, items, labels, epochs=1, batch_size=batch_size)
+            return n_samples
+    elif profile == "latency":
+        def step():
+            model.get_recommendations(int(rng.integers(0, n_users)), item_ids, top_k=10)
+            return 1
+    else:
+        def step():
+            model.recommend_batch(rng.integers(0, n_users, batch_size), item_ids, top_k=10)
+            return batch_size
+
+    step()  # Warm-up
+    try:
+        barrier.wait(timeout=startup_timeout)
+    except threading.BrokenBarrierError:
+        return  # A sibling died or stalled; calibrate() drops this configuration
+
+    units = 0
+    latencies = []
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        step_start = time.perf_counter()
+        units += step()
+        latencies.append(time.perf_counter() - step_start)
+
+    queue.put((units, time.perf_counter() - start, latencies))
+
+
+def calibrate(
+    profile: str,
+    settings: dict,
+    model_config: dict,
+    duration: float,
+    startup_timeout: float = STARTUP_TIMEOUT
+) -> Optional[dict]:
+    """
+    Run `processes` workers with the given settings, return throughput and latency
+
+    Returns None if a worker crashed (e.g. out of memory) or did not report
+    back in time; the stragglers are terminated.
+    """
+    ctx = mp.get_context("spawn")
+    n_processes = settings["processes"]
+    barrier = ctx.Barrier(n_processes)
+    queue = ctx.Queue()
+
+    workers = [
+        ctx.Process(
+            target=_calibration_worker,
+            args=(profile, settings, model_config, duration, startup_timeout, barrier, queue)
+        )
+        for _ in range(n_processes)
+    ]
+    for worker in workers:
+        worker.start()
+
+    # Generous: the last timed step may overrun `duration`
+    deadline = time.monotonic() + startup_timeout + 2 * duration
+    results = []
+    while len(results) < n_processes:
+        try:
+            results.append(queue.get(timeout=1.0))
+        except Empty:
+            failed = any(worker.exitcode not in (None, 0) for worker in workers)
+            if failed or time.monotonic() > deadline:
+                break
+
+    for worker in workers:
+        if worker.is_alive():
+            worker.terminate()
+        worker.join()
+
+    if len(results) < n_processes:
+        return None
+
+    latencies = np.concatenate([r[2] for r in results])
+    return {
+        "throughput": float(sum(units / seconds for units, seconds, _ in results)),
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+    }
+
+
+def _is_better(profile: str, result: dict, best: dict) -> bool:
+    """Throughput for train/bulk; p95 latency for latency (throughput breaks near-ties)"""
+    if best is None:
+        return True
+    if profile == "latency":
+        if result["p95_ms"] < best["p95_ms"] * 0.95:
+            return True
+        return result["p95_ms"] <= best["p95_ms"] * 1.05 and result["throughput"] > best["throughput"]
+    return result["throughput"] > best["throughput"]
+
+
+def _powers_of_two(limit: int) -> list:
+    values = [1]
+    while values[-1] * 2 <= limit:
+        values.append(values[-1] * 2)
+    if values[-1] != limit:
+        values.append(limit)
+    return values
+
+
+def tune_profile(profile: str, cores: int, model_config: dict, duration: float) -> Optional[dict]:
+    """Coordinate search for one profile, returns the best settings (None if nothing ran)"""
+    best, best_result = None, None
+
+    def consider(settings):
+        nonlocal best, best_result
+        result = calibrate(profile, settings, model_config, duration)
+        batch = settings["batch_size"] or "-"
+        label = (f"  processes={settings['processes']:<3} intra={settings['intra_op_threads']:<3} "
+                 f"inter={settings['inter_op_threads']:<2} batch={batch:<5} ")
+        if result is None:
+            print(f"{label}-> failed, skipped")
+            return
+        print(f"{label}-> {result['throughput']:12.1f}/s  p95 {result['p95_ms']:8.2f} ms")
+        if _is_better(profile, result, best_result):
+            best, best_result = dict(settings), result
+
+    # 1. Processes x intra-op threads
+    for processes in _powers_of_two(cores):
+        for threads in _powers_of_two(cores // processes):
+            consider({
+                "processes": processes,
+                "intra_op_threads": threads,
+                "inter_op_threads": 1,
+                "batch_size": DEFAULT_BATCH_SIZE[profile],
+            })
+    if best is None:
+        return None
+
+    # 2. Batch size
+    for batch_size in BATCH_SIZES[profile]:
+        if batch_size != DEFAULT_BATCH_SIZE[profile]:
+            consider(dict(best, batch_size=batch_size))
+
+    # 3. Inter-op threads (only matters with spare cores)
+    spare = cores // best["processes"] - best["intra_op_threads"]
+    for inter_op in _powers_of_two(max(spare, 1))[1:]:
+        consider(dict(best, inter_op_threads=inter_op))
+
+    return dict(best, **best_result)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Autotune CPU settings for Shitty NCF")
+    parser.add_argument("--profiles", type=str, nargs="+", default=list(PROFILES), choices=PROFILES)
+    parser.add_argument("--data-type", type=str, default="ott", choices=["ott", "social", "media"],
+                        help="Take model size from this trained model, if present")
+    parser.add_argument("--n-users", type=int, default=None)
+    parser.add_argument("--n-items", type=int, default=None)
+    parser.add_argument("--embedding-dim", type=int, default=None)
+    parser.add_argument("--duration", type=float, default=2.0, help="Seconds per calibration run")
+    parser.add_argument("--cores", type=int, default=os.cpu_count())
+    parser.add_argument("--output", type=str, default=None, help="Profile path (defaults to this host's)")
+
+    args = parser.parse_args()
+
+    # Calibrate on the real model size when we have one
+    model_config = {"n_users": 1000, "n_items": 1000, "embedding_dim": 16}
+    model_path = f"models/{args.data_type}_ncf.pth"
+    if os.path.exists(model_path):
+        checkpoint = torch.load(model_path, map_location='cpu')
+        model_config = {key: checkpoint[key] for key in ("n_users", "n_items", "embedding_dim")}
+    for key in model_config:
+        if getattr(args, key) is not None:
+            model_config[key] = getattr(args, key)
+
+    output_path = args.output or default_profile_path()
+
+    print("=" * 50)
+    print("Shitty NCF Autotune")
+    print("=" * 50)
+    print(f"Host: {socket.gethostname()} ({args.cores} cores)")
+    print(f"Model: {model_config['n_users']} users x {model_config['n_items']} items, "
+          f"dim {model_config['embedding_dim']}")
+    print()
+
+    # Keep previously tuned profiles we're not re-running
+    tuning = load_tuning_profile(output_path)
+    tuning.update({
+        "host": socket.gethostname(),
+        "cores": args.cores,
+        "torch_version": torch.__version__,
+        "model": model_config,
+    })
+    tuning.setdefault("profiles", {})
+
+    for profile in args.profiles:
+        print(f"Tuning {profile}...")
+        best = tune_profile(profile, args.cores, model_config, args.duration)
+        if best is None:
+            print(f"  Every configuration failed, keeping the previous {profile} settings")
+        else:
+            tuning["profiles"][profile] = best
+        print()
+
+    save_tuning_profile(tuning, output_path)
+
+    print("=" * 50)
+    print(f"Tuning complete! Profile saved to: {output_path}")
+    for profile in args.profiles:
+        if profile not in tuning["profiles"]:
+            continue
+        best = tuning["profiles"][profile]
+        print(f"  {profile:8} processes={best['processes']} intra={best['intra_op_threads']} "
+              f"inter={best['inter_op_threads']} batch={best['batch_size']}")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Benchmark bfloat16 mixed precision against float32
+Reports training and bulk-scoring throughput plus the quality change:
+holdout loss for training, top-k overlap with the float32 ranking for inference
+(both the bulk recommend_batch path and the single-user get_recommendations path)
+"""
+
+import sys
+import os
+import copy
+import time
+import numpy as np
+import torch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.ncf_model import ShittyNCF, train_shitty_ncf
+from scripts.train_model import load_data
+
+
+def holdout_bce(model: ShittyNCF, user_ids, item_ids, labels, mixed_precision: bool) -> float:
+    """Binary cross-entropy on held-out rows"""
+    predictions = np.clip(model.predict(user_ids, item_ids, mixed_precision=mixed_precision), 1e-7, 1 - 1e-7)
+    return float(-np.mean(labels * np.log(predictions) + (1 - labels) * np.log(1 - predictions)))
+
+
+def bench_training(train, val, n_users, n_items, args, mixed_precision: bool) -> dict:
+    """Train from a fixed seed and time it"""
+    # Warm-up so one-off startup costs (allocator, kernel selection) don't land in the timing
+    warmup = ShittyNCF(n_users, n_items, embedding_dim=args.embedding_dim, hidden_dims=[32, 16])
+    train_shitty_ncf(
+        model=warmup,
+        user_ids=train[0][:args.batch_size * 8],
+        item_ids=train[1][:args.batch_size * 8],
+        labels=train[2][:args.batch_size * 8],
+        epochs=1,
+        batch_size=args.batch_size,
+        mixed_precision=mixed_precision
+    )
+
+    torch.manual_seed(args.seed)
+    np.random.seed(args.seed)
+
+    model = ShittyNCF(n_users, n_items, embedding_dim=args.embedding_dim, hidden_dims=[32, 16])
+
+    start = time.perf_counter()
+    losses = train_shitty_ncf(
+        model=model,
+        user_ids=train[0],
+        item_ids=train[1],
+        labels=train[2],
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        learning_rate=args.lr,
+        mixed_precision=mixed_precision
+    )
+    seconds = time.perf_counter() - start
+
+    return {
+        "model": model,
+        "samples_per_sec": len(train[0]) * args.epochs / seconds,
+        "train_loss": losses[-1],
+        "holdout_loss": holdout_bce(model, *val, mixed_precision=mixed_precision),
+    }
+
+
+def bench_scoring(model: ShittyNCF, n_users: int, n_items: int, args, mixed_precision: bool) -> dict:
+    """Bulk top-k for every user, best of a few repeats"""
+    user_ids = np.arange(n_users)
+    item_ids = np.arange(n_items)
+
+    best = float("inf")
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        top_items, _ = model.recommend_batch(user_ids, item_ids, top_k=args.top_k, mixed_precision=mixed_precision)
+        best = min(best, time.perf_counter() - start)
+
+    return {"users_per_sec": n_users / best, "top_items": top_items}
+
+
+def bench_single_user(model: ShittyNCF, n_users: int, n_items: int, args, mixed_precision: bool) -> dict:
+    """One get_recommendations call per user, the path single requests take"""
+    item_ids = np.arange(n_items)
+
+    start = time.perf_counter()
+    top_items = np.stack([
+        model.get_recommendations(user_id, item_ids, top_k=args.top_k, mixed_precision=mixed_precision)[0]
+        for user_id in range(n_users)
+    ])
+    seconds = time.perf_counter() - start
+
+    return {"users_per_sec": n_users / seconds, "top_items": top_items}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="bf16 vs fp32 benchmark for Shitty NCF")
+    parser.add_argument("--data-type", type=str, default="ott", choices=["ott", "social", "media"])
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--lr", type=float, default=0.01)
+    parser.add_argument("--embedding-dim", type=int, default=16)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--val-fraction", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=42)
+
+    args = parser.parse_args()
+
+    user_ids, item_ids, labels, metadata = load_data(args.data_type)
+    n_users, n_items = metadata["n_users"], metadata["n_items"]
+
+    # The generator already shuffled the rows, so the tail is a fair holdout
+    split = int(len(labels) * (1 - args.val_fraction))
+    train = (user_ids[:split], item_ids[:split], labels[:split])
+    val = (user_ids[split:], item_ids[split:], labels[split:])
+
+    capability = getattr(torch.backends.cpu, "get_cpu_capability", lambda: "unknown")()
+
+    print("=" * 50)
+    print("Mixed Precision Benchmark (bf16 vs fp32)")
+    print("=" * 50)
+    print(f"Data type: {args.data_type}")
+    print(f"CPU capability: {capability}, threads: {torch.get_num_threads()}")
+    print()
+
+    print("Training fp32...")
+    fp32 = bench_training(train, val, n_users, n_items, args, mixed_precision=False)
+    print("Training bf16...")
+    bf16 = bench_training(train, val, n_users, n_items, args, mixed_precision=True)
+
+    # Inference: same fp32-trained weights, scored in fp32, under autocast and fully cast to bf16
+    model = fp32["model"]
+    bf16_model = copy.deepcopy(model).to(torch.bfloat16)
+
+    fp32_scoring = bench_scoring(model, n_users, n_items, args, mixed_precision=False)
+    autocast_scoring = bench_scoring(model, n_users, n_items, args, mixed_precision=True)
+    bf16_scoring = bench_scoring(bf16_model, n_users, n_items, args, mixed_precision=True)
+
+    fp32_single = bench_single_user(model, n_users, n_items, args, mixed_precision=False)
+    autocast_single = bench_single_user(model, n_users, n_items, args, mixed_precision=True)
+    bf16_single = bench_single_user(bf16_model, n_users, n_items, args, mixed_precision=True)
+
+    def overlap(scoring, reference=fp32_scoring):
+        """Mean share of the fp32 top-k that survives"""
+        return np.mean([
+            len(np.intersect1d(a, b)) / args.top_k
+            for a, b in zip(reference["top_items"], scoring["top_items"])
+        ])
+
+    def change(new, old):
+        return f"{(new / old - 1) * 100:+.1f}%"
+
+    print()
+    print(f"{'':32}{'fp32':>12}{'bf16':>12}{'change':>10}")
+    print(f"{'Train samples/sec':32}{fp32['samples_per_sec']:12.0f}{bf16['samples_per_sec']:12.0f}"
+          f"{change(bf16['samples_per_sec'], fp32['samples_per_sec']):>10}")
+    print(f"{'Final train loss':32}{fp32['train_loss']:12.4f}{bf16['train_loss']:12.4f}"
+          f"{change(bf16['train_loss'], fp32['train_loss']):>10}")
+    print(f"{'Holdout loss':32}{fp32['holdout_loss']:12.4f}{bf16['holdout_loss']:12.4f}"
+          f"{change(bf16['holdout_loss'], fp32['holdout_loss']):>10}")
+    print(f"{'Scoring users/sec (autocast)':32}{fp32_scoring['users_per_sec']:12.0f}"
+          f"{autocast_scoring['users_per_sec']:12.0f}"
+          f"{change(autocast_scoring['users_per_sec'], fp32_scoring['users_per_sec']):>10}")
+    print(f"{'Scoring users/sec (bf16 weights)':32}{fp32_scoring['users_per_sec']:12.0f}"
+          f"{bf16_scoring['users_per_sec']:12.0f}"
+          f"{change(bf16_scoring['users_per_sec'], fp32_scoring['users_per_sec']):>10}")
+    print(f"{f'Top-{args.top_k} overlap (autocast)':32}{1.0:12.3f}{overlap(autocast_scoring):12.3f}")
+    print(f"{f'Top-{args.top_k} overlap (bf16 weights)':32}{1.0:12.3f}{overlap(bf16_scoring):12.3f}")
+    print(f"{f'Single-user top-{args.top_k} (autocast)':32}{1.0:12.3f}"
+          f"{overlap(autocast_single, fp32_single):12.3f}")
+    print(f"{f'Single-user top-{args.top_k} (bf16 w.)':32}{1.0:12.3f}"
+          f"{overlap(bf16_single, fp32_single):12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Build popularity fallback tables for cold users
+Writes a .npz lookup file for inference.py and a small JSON for the API routes
+"""
+
+import sys
+import os
+import json
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.fallback import build_fallback_tables, save_fallback_tables
+from scripts.train_model import load_data
+
+
+def build_all(data_type: str, top_n: int = 50):
+    """Build fallback tables for one data type"""
+    print(f"Building fallback tables for {data_type}...")
+
+    user_ids, item_ids, labels, metadata = load_data(data_type)
+
+    user_segments = metadata.get("user_segments")
+    if user_segments is None:
+        print("  No segments in metadata (regenerate data to get them), global table only")
+
+    tables = build_fallback_tables(
+        user_ids=user_ids,
+        item_ids=item_ids,
+        labels=labels,
+        n_users=metadata["n_users"],
+        n_items=metadata["n_items"],
+        user_segments=user_segments,
+        n_segments=metadata.get("n_segments", 0),
+        top_n=top_n
+    )
+
+    model_dir = "models"
+    os.makedirs(model_dir, exist_ok=True)
+    table_path = f"{model_dir}/{data_type}_fallback.npz"
+    save_fallback_tables(tables, table_path)
+
+    # Same item format as the precomputed recommendations
+    def to_json(items, scores):
+        return [
+            {
+                "itemId": int(item_id),
+                "score": float(score)
+            }
+            for item_id, score in zip(items, scores)
+        ]
+
+    fallback_json = {
+        "global": to_json(tables["global_items"], tables["global_scores"]),
+        "segments": {
+            str(segment): to_json(items, scores)
+            for segment, (items, scores) in enumerate(zip(tables["segment_items"], tables["segment_scores"]))
+        }
+    }
+
+    output_dir = "public/recommendations"
+    os.makedirs(output_dir, exist_ok=True)
+    json_path = f"{output_dir}/{data_type}_fallback.json"
+    with open(json_path, 'w') as f:
+        json.dump(fallback_json, f, indent=2)
+
+    print(f"[OK] Saved fallback tables to {table_path} and {json_path}")
+    print(f"  Segments: {len(tables['segment_items'])}")
+    print(f"  Items per table: {len(tables['global_items'])}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data-type", type=str, default="all", choices=["ott", "social", "media", "all"])
+    parser.add_argument("--top-n", type=int, default=50)
+
+    args = parser.parse_args()
+
+    data_types = ["ott", "social", "media"] if args.data_type == "all" else [args.data_type]
+
+    for data_type in data_types:
+        build_all(data_type, args.top_n)
+        print()
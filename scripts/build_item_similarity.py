@@ -0,0 +1,69 @@
+"""
+Build the item-to-item "more like this" index
+Uses the training interactions, blended with the trained model's item
+embeddings when a model is available
+"""
+
+import sys
+import os
+import torch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.item_similarity import build_item_similarity, save_item_similarity
+from scripts.train_model import load_data
+
+
+def build_all(data_type: str, top_k: int = 20, embedding_weight: float = 0.3, chunk_size: int = 256):
+    """Build the similarity index for one data type"""
+    print(f"Building item similarity for {data_type}...")
+
+    user_ids, item_ids, labels, metadata = load_data(data_type)
+
+    item_embeddings = None
+    model_path = f"models/{data_type}_ncf.pth"
+    if embedding_weight > 0 and os.path.exists(model_path):
+        checkpoint = torch.load(model_path, map_location='cpu')
+        item_embeddings = checkpoint['model_state_dict']['item_embedding.weight'][:metadata["n_items"]].numpy()
+    elif embedding_weight > 0:
+        print(f"  Model not found: {model_path}, using co-occurrence only")
+
+    neighbors, scores = build_item_similarity(
+        user_ids=user_ids,
+        item_ids=item_ids,
+        labels=labels,
+        n_users=metadata["n_users"],
+        n_items=metadata["n_items"],
+        item_embeddings=item_embeddings,
+        embedding_weight=embedding_weight,
+        top_k=top_k,
+        chunk_size=chunk_size
+    )
+
+    model_dir = "models"
+    os.makedirs(model_dir, exist_ok=True)
+    prefix = f"{model_dir}/{data_type}_similar"
+    save_item_similarity(neighbors, scores, prefix)
+
+    print(f"[OK] Saved item similarity to {prefix}_neighbors.npy / {prefix}_scores.npy")
+    print(f"  Items: {neighbors.shape[0]}")
+    print(f"  Neighbours per item: {neighbors.shape[1]}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data-type", type=str, default="all", choices=["ott", "social", "media", "all"])
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--embedding-weight", type=float, default=0.3,
+                        help="Blend weight of embedding cosine (0 = co-occurrence only)")
+    parser.add_argument("--chunk-size", type=int, default=256)
+
+    args = parser.parse_args()
+
+    data_types = ["ott", "social", "media"] if args.data_type == "all" else [args.data_type]
+
+    for data_type in data_types:
+        build_all(data_type, args.top_k, args.embedding_weight, args.chunk_size)
+        print()
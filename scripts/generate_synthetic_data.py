@@ -74,7 +74,8 @@ def main():
         
         np.save(f"{data_dir}/{data_type}_user_ids.npy", all_user_ids)
         np.save(f"{data_dir}/{data_type}_item_ids.npy", all_item_ids)
-        np.save(f"{data_dir}/{data_type}_labels.npy", all_labels)
+        # float32 is what training consumes, so memory-mapped labels need no copy
+        np.save(f"{data_dir}/{data_type}_labels.npy", all_labels.astype(np.float32))
         
         # Save metadata
         metadata["n_positive"] = int(np.sum(labels))
@@ -1,6 +1,10 @@
 """
 Inference script for Shitty NCF model
 Called from Next.js API route
+
+Bulk mode (--bulk) streams user IDs, one per line, from --input (file or
+stdin) and writes recommendations incrementally to --output as JSON lines,
+or as binary records (see bulk_record_dtype).
 """
 
 import sys
@@ -13,10 +17,24 @@ import torch
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from lib.ncf_model import ShittyNCF
+from lib.fallback import FallbackRecommender
+from lib.embedding_store import attach_model
+from lib.item_similarity import ItemSimilarityIndex
+from lib.tuning import apply_tuning
+from lib.score_store import ScoreStore
 
 
-def load_model(data_type: str):
-    """Load trained model"""
+def load_model(data_type: str, store_dir: str = None, bf16: bool = False):
+    """
+    Load trained model (or attach to a shared embedding store)
+    
+    With bf16 the weights are cast to bfloat16, halving the embedding
+    tables. Shared-store models keep their float32 maps (casting would
+    make a private copy) and rely on autocast alone.
+    """
+    if store_dir is not None:
+        return attach_model(store_dir)
+    
     model_path = f"models/{data_type}_ncf.pth"
     
     if not os.path.exists(model_path):
@@ -34,45 +52,226 @@ def load_model(data_type: str):
     model.load_state_dict(checkpoint['model_state_dict'])
     model.eval()
     
+    if bf16:
+        model = model.to(torch.bfloat16)
+    
     return model, checkpoint
 
 
+def load_fallback(data_type: str):
+    """Load popularity fallback tables, None if they haven't been built"""
+    fallback_path = f"models/{data_type}_fallback.npz"
+    
+    if not os.path.exists(fallback_path):
+        return None
+    
+    return FallbackRecommender.load(fallback_path)
+
+
+def format_recommendations(top_items: np.ndarray, top_scores: np.ndarray) -> list:
+    """Format (item_ids, scores) the way the Next.js API expects"""
+    return [
+        {
+            "itemId": int(item_id),
+            "score": float(score)
+        }
+        for item_id, score in zip(top_items, top_scores)
+    ]
+
+
+def bulk_record_dtype(top_k: int) -> np.dtype:
+    """Binary bulk output: one fixed-size record per user, item -1 = no recommendation"""
+    return np.dtype([
+        ("user_id", "<i8"),
+        ("item_ids", "<i4", (top_k,)),
+        ("scores", "<f4", (top_k,)),
+    ])
+
+
+def iter_user_chunks(stream, chunk_size: int):
+    """Yield arrays of user IDs from a text stream, skipping lines that aren't integers"""
+    chunk = []
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            chunk.append(int(line))
+        except ValueError:
+            print(f"Skipping invalid user ID: {line!r}", file=sys.stderr)
+            continue
+        if len(chunk) >= chunk_size:
+            yield np.array(chunk, dtype=np.int64)
+            chunk = []
+    if chunk:
+        yield np.array(chunk, dtype=np.int64)
+
+
+def run_bulk(args, fallback):
+    """Score a stream of users chunk by chunk, memory is bounded by --chunk-size"""
+    model, checkpoint = load_model(args.data_type, args.store_dir, bf16=args.bf16)
+    item_ids = np.arange(checkpoint['n_items'])
+    top_k = args.top_k
+    
+    in_stream = sys.stdin if args.input == "-" else open(args.input, "r")
+    binary = args.format == "binary"
+    if args.output == "-":
+        out_stream = sys.stdout.buffer if binary else sys.stdout
+    else:
+        out_stream = open(args.output, "wb" if binary else "w")
+    
+    n_users = 0
+    try:
+        for user_ids in iter_user_chunks(in_stream, args.chunk_size):
+            top_items = np.full((len(user_ids), top_k), -1, dtype=np.int64)
+            top_scores = np.zeros((len(user_ids), top_k), dtype=np.float32)
+            
+            # Known users go through the model in one batch, the rest hit the fallback
+            known = (user_ids >= 0) & (user_ids < model.num_users)
+            if known.any():
+                items, scores = model.recommend_batch(
+                    user_ids[known], item_ids, top_k=top_k, mixed_precision=args.bf16
+                )
+                top_items[known, :items.shape[1]] = items
+                top_scores[known, :scores.shape[1]] = scores
+            
+            if fallback is not None:
+                for row in np.flatnonzero(~known):
+                    items, scores = fallback.get_recommendations(
+                        user_id=int(user_ids[row]),
+                        segment=args.segment,
+                        top_k=top_k
+                    )
+                    top_items[row, :len(items)] = items
+                    top_scores[row, :len(scores)] = scores
+            
+            if binary:
+                records = np.zeros(len(user_ids), dtype=bulk_record_dtype(top_k))
+                records["user_id"] = user_ids
+                records["item_ids"] = top_items
+                records["scores"] = top_scores
+                out_stream.write(records.tobytes())
+            else:
+                # Without fallback tables unknown users get an empty list, say so
+                cold_source = "fallback" if fallback is not None else "unknown"
+                for row, user_id in enumerate(user_ids):
+                    valid = top_items[row] >= 0
+                    result = {
+                        "userId": int(user_id),
+                        "source": "model" if known[row] else cold_source,
+                        "recommendations": format_recommendations(top_items[row][valid], top_scores[row][valid])
+                    }
+                    out_stream.write(json.dumps(result) + "\n")
+            
+            out_stream.flush()
+            n_users += len(user_ids)
+    finally:
+        if in_stream is not sys.stdin:
+            in_stream.close()
+        if args.output != "-":
+            out_stream.close()
+    
+    print(f"[OK] Scored {n_users} users", file=sys.stderr)
+
+
 def main():
     import argparse
     
     parser = argparse.ArgumentParser(description="Inference for Shitty NCF")
     parser.add_argument("--data-type", type=str, required=True)
-    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--user-id", type=int, default=None)
+    parser.add_argument("--similar-to", type=int, default=None,
+                        help="Item ID for \"more like this\" (instead of --user-id)")
     parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--segment", type=int, default=None,
+                        help="Segment for cold users (defaults to global popularity)")
+    parser.add_argument("--store-dir", type=str, default=None,
+                        help="Attach to a shared embedding store instead of loading the checkpoint")
+    parser.add_argument("--bulk", action="store_true",
+                        help="Stream user IDs from --input instead of a single --user-id")
+    parser.add_argument("--input", type=str, default="-", help="Bulk input file, one user ID per line (- = stdin)")
+    parser.add_argument("--output", type=str, default="-", help="Bulk output file (- = stdout)")
+    parser.add_argument("--format", type=str, default="jsonl", choices=["jsonl", "binary"])
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="Users scored per batch in bulk mode (defaults to the tuned batch size, or 1024)")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    parser.add_argument("--bf16", action="store_true", help="bfloat16 inference")
+    parser.add_argument("--score-store", action="store_true",
+                        help="Rank from the precomputed full score store instead of the model")
+    parser.add_argument("--exclude", type=int, nargs="*", default=None,
+                        help="Item IDs to leave out (score store only)")
+    parser.add_argument("--category", type=int, nargs="*", default=None,
+                        help="Only items in these categories (score store only)")
     
     args = parser.parse_args()
     
-    # Load model
-    model, checkpoint = load_model(args.data_type)
+    if sum([args.user_id is not None, args.similar_to is not None, args.bulk]) != 1:
+        parser.error("exactly one of --user-id, --similar-to and --bulk is required")
     
-    # Get all item IDs
-    n_items = checkpoint['n_items']
-    item_ids = np.arange(n_items)
+    # Per-host thread settings from scripts/autotune.py; --threads still wins
+    tuning = apply_tuning("bulk" if args.bulk else "latency")
+    if args.chunk_size is None:
+        args.chunk_size = tuning.get("batch_size") or 1024
+    if args.threads is not None:
+        torch.set_num_threads(args.threads)
     
-    # Get recommendations
-    top_items, top_scores = model.get_recommendations(
-        user_id=args.user_id,
-        item_ids=item_ids,
-        top_k=args.top_k
-    )
+    if args.bulk:
+        run_bulk(args, load_fallback(args.data_type))
+        return
     
-    # Format output
-    recommendations = [
-        {
-            "itemId": int(item_id),
-            "score": float(score)
+    if args.similar_to is not None:
+        # Item-to-item lookup, no model needed
+        index = ItemSimilarityIndex(f"models/{args.data_type}_similar")
+        top_items, top_scores = index.similar_items(args.similar_to, top_k=args.top_k)
+        result = {
+            "itemId": args.similar_to,
+            "source": "similar",
+            "recommendations": format_recommendations(top_items, top_scores)
         }
-        for item_id, score in zip(top_items, top_scores)
-    ]
+        print(json.dumps(result))
+        return
+    
+    # Cold users never reach the model: constant-time popularity lookup
+    fallback = load_fallback(args.data_type)
+    if fallback is not None and fallback.is_cold(args.user_id):
+        source = "fallback"
+        top_items, top_scores = fallback.get_recommendations(
+            user_id=args.user_id,
+            segment=args.segment,
+            top_k=args.top_k
+        )
+    elif args.score_store:
+        # No model at request time, just one row of the score store
+        source = "score_store"
+        store = ScoreStore(f"models/{args.data_type}_scores")
+        top_items, top_scores = store.top_k(
+            args.user_id,
+            k=args.top_k,
+            exclude=args.exclude,
+            categories=args.category
+        )
+    else:
+        source = "model"
+        
+        # Load model
+        model, checkpoint = load_model(args.data_type, args.store_dir, bf16=args.bf16)
+        
+        # Get all item IDs
+        n_items = checkpoint['n_items']
+        item_ids = np.arange(n_items)
+        
+        # Get recommendations
+        top_items, top_scores = model.get_recommendations(
+            user_id=args.user_id,
+            item_ids=item_ids,
+            top_k=args.top_k,
+            mixed_precision=args.bf16
+        )
     
     result = {
         "userId": args.user_id,
-        "recommendations": recommendations
+        "source": source,
+        "recommendations": format_recommendations(top_items, top_scores)
     }
     
     # Output JSON (will be captured by Next.js API)
@@ -0,0 +1,138 @@
+"""
+Online updates for the shitty NCF model
+Tails an append-only interaction log ("user_id,item_id" per line), trains on
+micro-batches of new events and periodically publishes versioned weights
+"""
+
+import sys
+import os
+import time
+import numpy as np
+import torch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.online import LogTailer, OnlineTrainer
+from lib.embedding_store import publish_embeddings
+from lib.fallback import extend_fallback_users
+from scripts.inference import load_model
+
+
+def publish(trainer: OnlineTrainer, checkpoint: dict, data_type: str, log_offset: int, store_dir: str = None) -> dict:
+    """Save a new model version next to (and then over) the current checkpoint"""
+    model = trainer.model
+    checkpoint = dict(
+        checkpoint,
+        model_state_dict=trainer.state_dict(),
+        n_users=model.num_users,
+        n_items=model.num_items,
+        version=checkpoint.get("version", 0) + 1,
+        log_offset=log_offset
+    )
+
+    # Write to a temp file first so readers never load a half-written model
+    model_path = f"models/{data_type}_ncf.pth"
+    tmp_path = model_path + ".tmp"
+    torch.save(checkpoint, tmp_path)
+    os.replace(tmp_path, model_path)
+
+    if store_dir is not None:
+        publish_embeddings(checkpoint, store_dir)
+
+    # Users we just learned about aren't cold anymore
+    fallback_path = f"models/{data_type}_fallback.npz"
+    if os.path.exists(fallback_path):
+        extend_fallback_users(fallback_path, model.num_users)
+
+    print(f"[OK] Published version {checkpoint['version']} "
+          f"({model.num_users} users, {model.num_items} items, log offset {log_offset})")
+
+    return checkpoint
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Online updates for Shitty NCF")
+    parser.add_argument("--data-type", type=str, default="ott", choices=["ott", "social", "media"])
+    parser.add_argument("--log", type=str, required=True, help="Append-only interaction log")
+    parser.add_argument("--batch-size", type=int, default=256, help="Events per micro-batch")
+    parser.add_argument("--flush-interval", type=float, default=5.0,
+                        help="Seconds before a partial micro-batch is trained anyway")
+    parser.add_argument("--publish-interval", type=float, default=60.0)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--lr", type=float, default=0.005)
+    parser.add_argument("--negatives", type=int, default=4, help="Sampled negatives per event")
+    parser.add_argument("--store-dir", type=str, default=None,
+                        help="Also publish each version to this shared embedding store")
+    parser.add_argument("--from-start", action="store_true",
+                        help="Ignore the log offset saved in the checkpoint")
+    parser.add_argument("--once", action="store_true",
+                        help="Exit after catching up with the log")
+
+    args = parser.parse_args()
+
+    model, checkpoint = load_model(args.data_type)
+    trainer = OnlineTrainer(model, learning_rate=args.lr, n_negatives=args.negatives)
+
+    offset = 0 if args.from_start else checkpoint.get("log_offset", 0)
+    tailer = LogTailer(args.log, offset)
+
+    print(f"Tailing {args.log} from byte {offset} (model version {checkpoint.get('version', 0)})")
+
+    pending = []
+    pending_since = last_publish = time.time()
+    n_unpublished = 0
+    loss = float("nan")
+
+    def train(batch):
+        batch = np.array(batch, dtype=np.int64)
+        return trainer.update(batch[:, 0], batch[:, 1])
+
+    try:
+        while True:
+            events = tailer.read_new()
+            now = time.time()
+            if events and not pending:
+                pending_since = now
+            pending.extend(events)
+
+            # Full micro-batches go straight in
+            while len(pending) >= args.batch_size:
+                loss = train(pending[:args.batch_size])
+                n_unpublished += args.batch_size
+                del pending[:args.batch_size]
+                pending_since = now
+
+            publish_due = now - last_publish >= args.publish_interval or (args.once and not events)
+
+            # A partial batch waits for more events, but not forever, and never past a publish
+            # (the published log offset must not skip events we haven't trained on)
+            if pending and (now - pending_since >= args.flush_interval or publish_due):
+                loss = train(pending)
+                n_unpublished += len(pending)
+                pending = []
+
+            if n_unpublished and publish_due:
+                print(f"  Trained on {n_unpublished} events, last loss {loss:.4f}")
+                checkpoint = publish(trainer, checkpoint, args.data_type, tailer.offset, args.store_dir)
+                n_unpublished = 0
+                last_publish = now
+
+            if not events:
+                if args.once:
+                    break
+                time.sleep(args.poll_interval)
+    except KeyboardInterrupt:
+        if pending:
+            train(pending)
+            n_unpublished += len(pending)
+        if n_unpublished:
+            publish(trainer, checkpoint, args.data_type, tailer.offset, args.store_dir)
+
+    if tailer.n_malformed:
+        print(f"Skipped {tailer.n_malformed} malformed log lines")
+
+
+if __name__ == "__main__":
+    main()
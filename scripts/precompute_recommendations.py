@@ -12,10 +12,23 @@ import torch
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from lib.ncf_model import ShittyNCF
+from lib.tuning import apply_tuning
+from lib.score_store import build_score_store
 
 
-def precompute_all(data_type: str, top_k: int = 10):
-    """Pre-compute recommendations for all users"""
+def precompute_all(
+    data_type: str,
+    top_k: int = 10,
+    batch_size: int = 512,
+    score_store: bool = False,
+    score_dtype: str = "uint8"
+):
+    """
+    Pre-compute recommendations for all users, batch_size users at a time
+    
+    With score_store, also write every user's full (quantized) score vector
+    to models/<data_type>_scores/ for lib.score_store.ScoreStore.
+    """
     print(f"Pre-computing recommendations for {data_type}...")
     
     # Load model
@@ -43,23 +56,24 @@ def precompute_all(data_type: str, top_k: int = 10):
     # Generate recommendations for all users
     all_recommendations = {}
     
-    for user_id in range(n_users):
-        top_items, top_scores = model.get_recommendations(
-            user_id=user_id,
+    for start in range(0, n_users, batch_size):
+        user_ids = np.arange(start, min(start + batch_size, n_users))
+        batch_items, batch_scores = model.recommend_batch(
+            user_ids=user_ids,
             item_ids=item_ids,
             top_k=top_k
         )
         
-        all_recommendations[user_id] = [
-            {
-                "itemId": int(item_id),
-                "score": float(score)
-            }
-            for item_id, score in zip(top_items, top_scores)
-        ]
+        for user_id, top_items, top_scores in zip(user_ids, batch_items, batch_scores):
+            all_recommendations[int(user_id)] = [
+                {
+                    "itemId": int(item_id),
+                    "score": float(score)
+                }
+                for item_id, score in zip(top_items, top_scores)
+            ]
         
-        if (user_id + 1) % 50 == 0:
-            print(f"  Processed {user_id + 1}/{n_users} users...")
+        print(f"  Processed {user_ids[-1] + 1}/{n_users} users...")
     
     # Save to JSON
     output_dir = "public/recommendations"
@@ -72,6 +86,19 @@ def precompute_all(data_type: str, top_k: int = 10):
     print(f"[OK] Saved recommendations to {output_path}")
     print(f"  Total users: {n_users}")
     print(f"  Recommendations per user: {top_k}")
+    
+    if score_store:
+        store_path = f"models/{data_type}_scores"
+        build_score_store(
+            model,
+            store_path,
+            n_users=n_users,
+            n_items=n_items,
+            dtype=score_dtype,
+            block_size=batch_size,
+            item_categories=checkpoint.get('metadata', {}).get('item_segments')
+        )
+        print(f"[OK] Saved full {score_dtype} score store to {store_path}")
 
 
 if __name__ == "__main__":
@@ -80,12 +107,22 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--data-type", type=str, default="all", choices=["ott", "social", "media", "all"])
     parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Users scored per batch (defaults to the tuned bulk batch size, or 512)")
+    parser.add_argument("--score-store", action="store_true",
+                        help="Also store every user's full item score vector")
+    parser.add_argument("--score-dtype", type=str, default="uint8", choices=["uint8", "float16"],
+                        help="uint8 is half the size; float16 keeps more near-equal scores apart")
     
     args = parser.parse_args()
     
+    # Per-host thread settings from scripts/autotune.py (if it was run)
+    tuning = apply_tuning("bulk")
+    batch_size = args.batch_size or tuning.get("batch_size") or 512
+    
     data_types = ["ott", "social", "media"] if args.data_type == "all" else [args.data_type]
     
     for data_type in data_types:
-        precompute_all(data_type, args.top_k)
+        precompute_all(data_type, args.top_k, batch_size, args.score_store, args.score_dtype)
         print()
 
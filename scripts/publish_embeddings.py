@@ -0,0 +1,47 @@
+"""
+Publish trained models into the shared embedding store
+Run once per model update; serving workers pick up the new generation on refresh
+"""
+
+import sys
+import os
+import torch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.embedding_store import default_store_dir, publish_embeddings
+
+
+def publish(data_type: str, store_dir: str = None, keep: int = 2):
+    """Publish models/<data_type>_ncf.pth into the store"""
+    model_path = f"models/{data_type}_ncf.pth"
+    if not os.path.exists(model_path):
+        print(f"Model not found: {model_path}")
+        return
+
+    checkpoint = torch.load(model_path, map_location='cpu')
+    store_dir = store_dir or default_store_dir(data_type)
+
+    generation = publish_embeddings(checkpoint, store_dir, keep=keep)
+
+    print(f"[OK] Published {data_type} to {store_dir} (generation {generation})")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data-type", type=str, default="all", choices=["ott", "social", "media", "all"])
+    parser.add_argument("--store-dir", type=str, default=None,
+                        help="Store directory (defaults to /dev/shm/nanoncf/<data-type>)")
+    parser.add_argument("--keep", type=int, default=2, help="Generations to keep (at least 2)")
+
+    args = parser.parse_args()
+
+    if args.store_dir and args.data_type == "all":
+        parser.error("--store-dir needs a single --data-type")
+
+    data_types = ["ott", "social", "media"] if args.data_type == "all" else [args.data_type]
+
+    for data_type in data_types:
+        publish(data_type, args.store_dir, args.keep)
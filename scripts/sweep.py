@@ -0,0 +1,260 @@
+"""
+Hyperparameter sweep for the shitty NCF model
+
+Runs trials in a process pool. Every worker memory-maps the same data files,
+so the dataset lives once in the page cache no matter how many trials run.
+Losing trials are stopped early with successive halving: everybody trains a
+few epochs, only the best 1/reduction-factor keep going.
+"""
+
+import sys
+import os
+import csv
+import math
+import warnings
+import itertools
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import torch
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.ncf_model import ShittyNCF, train_shitty_ncf
+from scripts.train_model import load_data
+from lib.tuning import load_tuning_profile
+
+
+HIDDEN_DIMS = [32, 16]
+
+# Per-worker state, filled in by _init_worker
+_DATA = {}
+
+
+def _init_worker(data_type: str, val_fraction: float, n_threads: int):
+    """Pin thread counts and attach to the memory-mapped dataset"""
+    torch.set_num_threads(n_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Already set in this process
+
+    user_ids, item_ids, labels, metadata = load_data(data_type, mmap_mode="r")
+
+    # Training wraps the read-only maps in tensors without copying (int64 IDs,
+    # float32 labels; older float64 label files get a private copy per worker)
+    warnings.filterwarnings("ignore", message="The given NumPy array is not writable")
+
+    # The generator already shuffled the rows, so the tail is a fair holdout
+    split = int(len(labels) * (1 - val_fraction))
+
+    _DATA.update({
+        "n_users": metadata["n_users"],
+        "n_items": metadata["n_items"],
+        "train": (user_ids[:split], item_ids[:split], labels[:split]),
+        "val": (user_ids[split:], item_ids[split:], labels[split:]),
+    })
+
+
+def _bce(predictions: np.ndarray, labels: np.ndarray) -> float:
+    """Binary cross-entropy, same as nn.BCELoss but on numpy arrays"""
+    predictions = np.clip(predictions, 1e-7, 1 - 1e-7)
+    return float(-np.mean(labels * np.log(predictions) + (1 - labels) * np.log(1 - predictions)))
+
+
+def _run_trial(trial_id: int, config: dict, epochs: int, state: tuple, seed: int):
+    """
+    Train one trial for `epochs` more epochs and score it on the holdout
+
+    `state` is the (model, optimizer) state dict pair from the previous rung,
+    or None to start fresh. Adam's moments carry over, so N epochs over
+    several rungs train like one train_model.py --epochs N run.
+    """
+    torch.manual_seed(seed)
+    np.random.seed(seed)
+
+    model = ShittyNCF(
+        num_users=_DATA["n_users"],
+        num_items=_DATA["n_items"],
+        embedding_dim=config["embedding_dim"],
+        hidden_dims=HIDDEN_DIMS
+    )
+    optimizer = torch.optim.Adam(model.parameters(), lr=config["lr"])
+    if state is not None:
+        model.load_state_dict(state[0])
+        optimizer.load_state_dict(state[1])
+
+    train_users, train_items, train_labels = _DATA["train"]
+    losses = train_shitty_ncf(
+        model=model,
+        user_ids=train_users,
+        item_ids=train_items,
+        labels=train_labels,
+        epochs=epochs,
+        batch_size=config["batch_size"],
+        learning_rate=config["lr"],
+        device="cpu",
+        optimizer=optimizer
+    )
+
+    val_users, val_items, val_labels = _DATA["val"]
+    val_loss = _bce(model.predict(val_users, val_items), np.asarray(val_labels))
+
+    return trial_id, losses[-1], val_loss, (model.state_dict(), optimizer.state_dict())
+
+
+def build_search_space(args) -> list:
+    """Expand the CLI options into a list of trial configs"""
+    if args.search == "grid":
+        return [
+            {"lr": lr, "embedding_dim": dim, "batch_size": bs}
+            for lr, dim, bs in itertools.product(args.lr, args.embedding_dim, args.batch_size)
+        ]
+
+    # Random search: log-uniform learning rate within the given range
+    rng = np.random.default_rng(args.seed)
+    low, high = math.log(min(args.lr)), math.log(max(args.lr))
+    return [
+        {
+            "lr": float(math.exp(rng.uniform(low, high))),
+            "embedding_dim": int(rng.choice(args.embedding_dim)),
+            "batch_size": int(rng.choice(args.batch_size)),
+        }
+        for _ in range(args.n_trials)
+    ]
+
+
+def rung_schedule(min_epochs: int, max_epochs: int, reduction_factor: int) -> list:
+    """Cumulative epoch budget at each successive halving rung"""
+    rungs = []
+    epochs = min_epochs
+    while epochs < max_epochs:
+        rungs.append(epochs)
+        epochs *= reduction_factor
+    rungs.append(max_epochs)
+    return rungs
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Hyperparameter sweep for Shitty NCF")
+    parser.add_argument("--data-type", type=str, default="ott", choices=["ott", "social", "media"])
+    parser.add_argument("--search", type=str, default="grid", choices=["grid", "random"])
+    parser.add_argument("--n-trials", type=int, default=20, help="Number of trials for random search")
+    parser.add_argument("--lr", type=float, nargs="+", default=[0.001, 0.005, 0.01, 0.05])
+    parser.add_argument("--embedding-dim", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[128, 256, 512])
+    parser.add_argument("--epochs", type=int, default=20, help="Epoch budget for surviving trials")
+    parser.add_argument("--min-epochs", type=int, default=2, help="Epochs before the first cut")
+    parser.add_argument("--reduction-factor", type=int, default=3)
+    parser.add_argument("--val-fraction", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Defaults to the tuned train process count, or one per core")
+    parser.add_argument("--threads-per-trial", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=str, default=None)
+
+    args = parser.parse_args()
+
+    # Tuned train profile if there is one, otherwise split the cores between workers
+    tuning = load_tuning_profile().get("profiles", {}).get("train", {})
+    args.workers = args.workers or tuning.get("processes") or os.cpu_count()
+    threads_per_trial = (
+        args.threads_per_trial
+        or (tuning.get("intra_op_threads") if args.workers == tuning.get("processes") else None)
+        or max(1, os.cpu_count() // args.workers)
+    )
+
+    labels = np.load(f"data/{args.data_type}_labels.npy", mmap_mode="r")
+    if labels.dtype != np.float32:
+        print(f"Note: labels are {labels.dtype}, every worker copies them "
+              f"(regenerate the data to share one float32 copy)")
+
+    configs = build_search_space(args)
+    rungs = rung_schedule(args.min_epochs, args.epochs, args.reduction_factor)
+
+    print("=" * 50)
+    print("Shitty NCF Hyperparameter Sweep")
+    print("=" * 50)
+    print(f"Data type: {args.data_type}")
+    print(f"Trials: {len(configs)} ({args.search})")
+    print(f"Rungs (epochs): {rungs}")
+    print(f"Workers: {args.workers} x {threads_per_trial} threads")
+    print()
+
+    results = {
+        trial_id: dict(config, trial=trial_id, epochs=0, train_loss=None, val_loss=None, status="running")
+        for trial_id, config in enumerate(configs)
+    }
+    states = {trial_id: None for trial_id in results}
+    active = list(results)
+
+    ctx = mp.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(args.data_type, args.val_fraction, threads_per_trial)
+    ) as pool:
+        trained = 0
+        for rung, rung_epochs in enumerate(rungs):
+            futures = [
+                pool.submit(
+                    _run_trial,
+                    trial_id,
+                    configs[trial_id],
+                    rung_epochs - trained,
+                    states[trial_id],
+                    args.seed + trial_id * len(rungs) + rung
+                )
+                for trial_id in active
+            ]
+
+            for future in futures:
+                trial_id, train_loss, val_loss, state = future.result()
+                states[trial_id] = state
+                results[trial_id].update(epochs=rung_epochs, train_loss=train_loss, val_loss=val_loss)
+
+            trained = rung_epochs
+            active.sort(key=lambda t: results[t]["val_loss"])
+
+            if rung == len(rungs) - 1:
+                for trial_id in active:
+                    results[trial_id]["status"] = "finished"
+                break
+
+            n_keep = max(1, len(active) // args.reduction_factor)
+            for trial_id in active[n_keep:]:
+                results[trial_id]["status"] = f"stopped@{rung_epochs}"
+                states[trial_id] = None  # Free the weights and Adam state, we won't resume it
+            active = active[:n_keep]
+
+            best = results[active[0]]
+            print(f"Rung {rung + 1}/{len(rungs)} ({rung_epochs} epochs): "
+                  f"kept {n_keep}, best val loss {best['val_loss']:.4f}")
+
+    # Write results table (finished trials first, then by val loss)
+    rows = sorted(results.values(), key=lambda r: (-r["epochs"], r["val_loss"]))
+    fields = ["trial", "lr", "embedding_dim", "batch_size", "epochs", "train_loss", "val_loss", "status"]
+
+    output_path = args.output or f"models/{args.data_type}_sweep.csv"
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+    best = rows[0]
+    print()
+    print("=" * 50)
+    print(f"Sweep complete! Results saved to: {output_path}")
+    print(f"Best trial: #{best['trial']} lr={best['lr']:.4g} "
+          f"embedding_dim={best['embedding_dim']} batch_size={best['batch_size']}")
+    print(f"Val loss: {best['val_loss']:.4f}")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
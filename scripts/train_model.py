@@ -12,15 +12,21 @@ import torch
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from lib.ncf_model import ShittyNCF, train_shitty_ncf
+from lib.tuning import apply_tuning
 
 
-def load_data(data_type: str = "ott"):
-    """Load synthetic data"""
+def load_data(data_type: str = "ott", mmap_mode: str = None):
+    """
+    Load synthetic data
+    
+    Pass mmap_mode="r" to memory-map the arrays instead of reading them,
+    so several processes can share one copy through the page cache.
+    """
     data_dir = "data"
     
-    user_ids = np.load(f"{data_dir}/{data_type}_user_ids.npy")
-    item_ids = np.load(f"{data_dir}/{data_type}_item_ids.npy")
-    labels = np.load(f"{data_dir}/{data_type}_labels.npy")
+    user_ids = np.load(f"{data_dir}/{data_type}_user_ids.npy", mmap_mode=mmap_mode)
+    item_ids = np.load(f"{data_dir}/{data_type}_item_ids.npy", mmap_mode=mmap_mode)
+    labels = np.load(f"{data_dir}/{data_type}_labels.npy", mmap_mode=mmap_mode)
     
     with open(f"{data_dir}/{data_type}_metadata.json", "r") as f:
         metadata = json.load(f)
@@ -34,20 +40,37 @@ def main():
     parser = argparse.ArgumentParser(description="Train Shitty NCF")
     parser.add_argument("--data-type", type=str, default="ott", choices=["ott", "social", "media"])
     parser.add_argument("--epochs", type=int, default=20)
-    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--batch-size", type=str, default="256",
+                        help="Batch size, or 'tuned' for this host's autotuned one (picked for speed, not quality)")
     parser.add_argument("--lr", type=float, default=0.01)
     parser.add_argument("--embedding-dim", type=int, default=16)
+    parser.add_argument("--loss", type=str, default="bce", choices=["bce", "bpr", "softmax"],
+                        help="Pointwise BCE, or pairwise with in-batch negatives")
+    parser.add_argument("--bf16", action="store_true",
+                        help="bfloat16 mixed precision (float32 master weights)")
     
     args = parser.parse_args()
     
+    # Per-host thread settings from scripts/autotune.py (if it was run)
+    tuning = apply_tuning("train")
+    if args.batch_size == "tuned":
+        args.batch_size = tuning.get("batch_size", 256)
+    elif args.batch_size.isdigit():
+        args.batch_size = int(args.batch_size)
+    else:
+        parser.error(f"--batch-size must be an integer or 'tuned', got {args.batch_size!r}")
+    
     print("=" * 50)
     print("Training Shitty NCF Model")
     print("=" * 50)
     print(f"Data type: {args.data_type}")
     print(f"Epochs: {args.epochs}")
     print(f"Batch size: {args.batch_size}")
+    print(f"Threads: {torch.get_num_threads()}")
     print(f"Learning rate: {args.lr}")
     print(f"Embedding dim: {args.embedding_dim}")
+    print(f"Loss: {args.loss}")
+    print(f"Mixed precision: {'bf16' if args.bf16 else 'off'}")
     print()
     
     # Load data
@@ -85,7 +108,9 @@ def main():
         epochs=args.epochs,
         batch_size=args.batch_size,
         learning_rate=args.lr,
-        device="cpu"
+        device="cpu",
+        loss_type=args.loss,
+        mixed_precision=args.bf16
     )
     
     # Save model
@@ -99,6 +124,9 @@ def main():
         "n_items": n_items,
         "embedding_dim": args.embedding_dim,
         "hidden_dims": [32, 16],
+        "loss_type": args.loss,
+        "mixed_precision": args.bf16,
+        "batch_size": args.batch_size,
         "losses": losses,
         "metadata": metadata
     }, model_path)